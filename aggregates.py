@@ -0,0 +1,114 @@
+import threading
+import weakref
+
+import numpy as np
+
+from sensor_registry import REGISTRY
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# Display titles for every statistic SensorStats provides
+STATISTICS = {
+    "mean": "Mean",
+    "median": "Median",
+    "min": "Minimum",
+    "max": "Maximum",
+    "std": "Standard Deviation",
+    "p05": "5th Percentile",
+    "p25": "25th Percentile",
+    "p75": "75th Percentile",
+    "p95": "95th Percentile",
+}
+
+# Colours of the first two datasets match the original Before/After plots
+DATASET_COLORS = ["blue", "red", "green", "orange", "purple", "brown", "magenta", "olive"]
+
+
+class SensorStats:
+    """Every per-sensor statistic for one dataset, one array per statistic."""
+
+    def __init__(self, labels, values):
+        self.labels = labels
+        self.values = values
+
+    def __getitem__(self, stat):
+        return self.values[stat]
+
+
+def sensor_matrix(frame):
+    """Return the sensor column labels of a frame and its (rows, sensors)
+    float32 matrix, as SensorRegistry.block provides it."""
+    positions, _, matrix = REGISTRY.block(frame)
+    return frame.columns[positions].tolist(), matrix
+
+
+def compute_stats(frame):
+    """Compute all statistics for every sensor column in one vectorized pass.
+
+    The median and the other percentiles come from a single partition of
+    each column, and mean/std accumulate in float64 even for float32 data.
+    """
+    labels, matrix = sensor_matrix(frame)
+    has_nan = np.isnan(matrix).any()
+    mean = np.nanmean if has_nan else np.mean
+    std = np.nanstd if has_nan else np.std
+    percentile = np.nanpercentile if has_nan else np.percentile
+
+    # matrix is Fortran-ordered, so matrix.T is C-ordered and each sensor a
+    # contiguous row; partitioning along rows is far faster than down columns
+    pct = percentile(matrix.T, PERCENTILES, axis=1)
+    values = {
+        "mean": mean(matrix, axis=0, dtype=np.float64),
+        "std": std(matrix, axis=0, dtype=np.float64),
+        "min": np.nanmin(matrix, axis=0),
+        "max": np.nanmax(matrix, axis=0),
+    }
+    for q, row in zip(PERCENTILES, pct):
+        values["median" if q == 50 else f"p{q:02d}"] = row
+    return SensorStats(labels, values)
+
+
+class StatsCache:
+    """Memoize SensorStats per loaded dataset.
+
+    Entries are tied to the frame object itself, so loading new files
+    (a new frame) recomputes while switching between statistics does not.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, frame):
+        """Return the cached stats for a frame, or None."""
+        with self._lock:
+            entry = self._entries.get(id(frame))
+        if entry is not None and entry[0]() is frame:
+            return entry[1]
+        return None
+
+    def stats(self, frame):
+        """Return the stats for a frame, computing them on first use."""
+        stats = self.get(frame)
+        if stats is None:
+            stats = compute_stats(frame)
+            key = id(frame)
+            ref = weakref.ref(frame, lambda _, key=key: self._forget(key))
+            with self._lock:
+                self._entries[key] = (ref, stats)
+        return stats
+
+    def _forget(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+def plot_statistic(ax, datasets, stat, title=None):
+    """Scatter one statistic per sensor for each (label, SensorStats) pair."""
+    for i, (label, stats) in enumerate(datasets):
+        values = stats[stat]
+        ax.scatter(np.arange(len(values)), values, label=label,
+                   color=DATASET_COLORS[i % len(DATASET_COLORS)])
+    ax.set_title(title or f"{STATISTICS[stat]} of Sensor Readings")
+    ax.legend()
+    ax.grid()
@@ -0,0 +1,154 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from sensor_store import to_epoch
+
+METHODS = ("asof", "linear")
+# Aligned matrices kept per process, least recently used dropped first
+MAX_CACHED = 8
+
+
+def parse_times(values):
+    """Parse 'YYYY-MM-DD HH:MM:SS' strings to int64 epoch seconds in one pass.
+
+    Naive times are taken as UTC, like sensor_store.to_epoch. Anything NumPy
+    cannot parse falls back to pandas.
+    """
+    values = np.asarray(values)
+    try:
+        return values.astype("datetime64[s]").astype(np.int64)
+    except ValueError:
+        import pandas as pd
+        parsed = pd.to_datetime(values, errors="coerce")
+        return parsed.to_numpy(dtype="datetime64[s]").astype(np.int64)
+
+
+class AlignedMatrix:
+    """Channels resampled onto one time grid as a contiguous (channels, times) array.
+
+    Slots a channel cannot fill (before its first sample, beyond the
+    tolerance, ...) are NaN.
+    """
+
+    def __init__(self, channels, grid, values):
+        self.channels = list(channels)
+        self.grid = grid
+        self.values = np.ascontiguousarray(values)
+
+    def row(self, name):
+        return self.values[self.channels.index(name)]
+
+    def select(self, names):
+        """A new AlignedMatrix with only the named channels, in that order."""
+        rows = [self.channels.index(n) for n in names]
+        return AlignedMatrix(names, self.grid, self.values[rows])
+
+    def window(self, start, end):
+        """A view restricted to start <= grid time < end."""
+        lo, hi = np.searchsorted(self.grid, [to_epoch(start), to_epoch(end)])
+        return AlignedMatrix(self.channels, self.grid[lo:hi], self.values[:, lo:hi])
+
+    def mean_across(self):
+        """Mean over channels at each grid time, ignoring NaN slots."""
+        valid = ~np.isnan(self.values)
+        total = np.where(valid, self.values, 0).sum(axis=0)
+        count = valid.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(count > 0, total / count, np.nan)
+
+    def correlation(self, min_overlap=2):
+        """Pairwise Pearson correlation over the grid times both channels have.
+
+        Computed for all pairs with a few matrix products over the NaN mask,
+        instead of one masked pass per pair. Pairs sharing fewer than
+        min_overlap times are NaN.
+        """
+        mask = ~np.isnan(self.values)
+        m = mask.astype(np.float64)
+        x = np.where(mask, self.values, 0.0)
+        n = m @ m.T
+        sx = x @ m.T                  # sum of x_i where j is present
+        sxx = (x * x) @ m.T
+        sxy = x @ x.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = n * sxy - sx * sx.T
+            var_i = n * sxx - sx * sx
+            corr = cov / np.sqrt(var_i * var_i.T)
+        corr[n < min_overlap] = np.nan
+        return np.clip(corr, -1, 1)
+
+
+def make_grid(result, step, mode="overlap"):
+    """Regular int64 grid with `step` seconds over the channels' time ranges.
+
+    mode "overlap" covers only the span every channel with data has;
+    "union" covers from the earliest to the latest sample of any channel.
+    """
+    counts = result.counts()
+    present = np.flatnonzero(counts)
+    if len(present) == 0:
+        return np.empty(0, dtype=np.int64)
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+    firsts = result.ts[bounds[present]]
+    lasts = result.ts[bounds[present + 1] - 1]
+    if mode == "union":
+        start, end = firsts.min(), lasts.max()
+    else:
+        start, end = firsts.max(), lasts.min()
+    if end < start:
+        return np.empty(0, dtype=np.int64)
+    start = -(-start // step) * step   # First grid time on a step boundary
+    return np.arange(start, end + 1, step, dtype=np.int64)
+
+
+def align(result, grid, method="asof", tolerance=None):
+    """Resample every channel of a QueryResult onto grid.
+
+    "asof" takes the last value at or before each time, NaN when it is older
+    than tolerance seconds; "linear" interpolates between neighbouring
+    samples, NaN across gaps longer than tolerance.
+    """
+    if method == "asof":
+        values = result.asof(grid, tolerance)
+    elif method == "linear":
+        values = result.interp(grid, tolerance)
+    else:
+        raise ValueError(f"Unknown alignment method {method!r}; use one of {METHODS}")
+    return AlignedMatrix(result.channels, np.asarray(grid, dtype=np.int64), values)
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def fetch_aligned(query, start, end, step, method="asof", tolerance=None, mode="overlap"):
+    """Fetch start <= time < end from a SensorQuery and align it on a `step`
+    second grid, reusing the cached matrix while the database is unchanged.
+
+    The cache is keyed by database, range and alignment settings and checked
+    against SQLite's data_version, so rows committed by the recorder make
+    the next call fetch again.
+    """
+    key = (query.db_path, to_epoch(start), to_epoch(end), step, method, tolerance, mode)
+    version = query.data_version()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == version:
+            _cache.move_to_end(key)
+            return entry[1]
+
+    result = query.fetch_range(start, end)
+    aligned = align(result, make_grid(result, step, mode), method, tolerance)
+    with _cache_lock:
+        _cache[key] = (version, aligned)
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED:
+            _cache.popitem(last=False)
+    return aligned
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,317 @@
+import os
+import sys
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import rollups
+import sensor_store
+from query_engine import QueryResult, SummaryResult, get_query
+from sensor_registry import REGISTRY
+
+FORMATS = ("parquet", "arrow")
+DEFAULT_COMPRESSION = {"parquet": "zstd", "arrow": "lz4"}
+# Rows per INSERT batch when importing
+IMPORT_BATCH_ROWS = 100_000
+
+
+def _arrow():
+    """Import pyarrow on first use; it is only needed for archives."""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.fs
+    except ImportError:
+        raise ImportError("Columnar archives need pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def _partitioning(pa):
+    return pa.dataset.partitioning(
+        pa.schema([("date", pa.string()), ("group", pa.string())]), flavor="hive"
+    )
+
+
+def export_archive(db_path, out_dir, fmt="parquet", compression=None, start=None, end=None):
+    """Write a database to out_dir/date=YYYY-MM-DD/group=XXX/part.<fmt>.
+
+    Days are fetched and written one at a time, so memory is bounded by one
+    day of samples. Rows are sorted by channel and time, and files carry
+    ts statistics, so readers can skip files and row groups by time.
+    Returns the number of rows written.
+    """
+    pa = _arrow()
+    import pyarrow.parquet as pq
+    import pyarrow.feather as feather
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown archive format {fmt!r}; use one of {FORMATS}")
+    compression = compression or DEFAULT_COMPRESSION[fmt]
+    query = get_query(db_path)
+    first, last = query.time_bounds()
+    if first is None:
+        return 0
+    start = sensor_store.from_epoch(first) if start is None else start
+    end = sensor_store.from_epoch(last + 1) if end is None else end
+
+    channels = query.channels
+    sensors = REGISTRY.indices(channels)
+    codes = np.where(sensors >= 0, REGISTRY.groups[sensors], len(REGISTRY.group_names) - 1)
+    groups = np.array(REGISTRY.group_names)[codes]
+    names = pa.array(channels).dictionary_encode()
+    day = datetime(start.year, start.month, start.day)
+    total = 0
+    while day < end:
+        result = query.fetch_range(max(day, start), min(day + timedelta(days=1), end))
+        for group in np.unique(groups[result.channel]) if len(result) else []:
+            rows = np.flatnonzero(groups[result.channel] == group)
+            table = pa.table({
+                "channel": pa.DictionaryArray.from_arrays(
+                    pa.array(result.channel[rows].astype(np.int32)), names.dictionary),
+                "ts": pa.array(result.ts[rows]).cast(pa.timestamp("s", tz="UTC")),
+                "value": pa.array(result.value[rows]),
+            })
+            part_dir = os.path.join(out_dir, f"date={day:%Y-%m-%d}", f"group={group}")
+            os.makedirs(part_dir, exist_ok=True)
+            if fmt == "parquet":
+                pq.write_table(table, os.path.join(part_dir, "part.parquet"),
+                               compression=compression, write_statistics=True)
+            else:
+                feather.write_feather(table, os.path.join(part_dir, "part.arrow"),
+                                      compression=None if compression == "none" else compression)
+            total += len(rows)
+        day += timedelta(days=1)
+    return total
+
+
+def open_archive(root, fmt=None):
+    """Open an archive directory as a pyarrow dataset over memory-mapped files."""
+    pa = _arrow()
+    if fmt is None:
+        fmt = "arrow" if _has_files(root, ".arrow") else "parquet"
+    return pa.dataset.dataset(
+        root,
+        format="ipc" if fmt == "arrow" else "parquet",
+        partitioning=_partitioning(pa),
+        filesystem=pa.fs.LocalFileSystem(use_mmap=True),
+    )
+
+
+def _has_files(root, suffix):
+    for _, _, files in os.walk(root):
+        if any(f.endswith(suffix) for f in files):
+            return True
+    return False
+
+
+def _epoch_seconds(pa, column):
+    """Timestamps as int64 epoch seconds (Parquet stores second units as ms)."""
+    return column.cast(pa.timestamp("s", tz="UTC")).cast(pa.int64())
+
+
+def _time_filter(pa, start, end):
+    """Filter on ts plus the date partition, so whole days are skipped unread."""
+    ds = pa.dataset
+    start_ts = pa.scalar(sensor_store.to_epoch(start), pa.int64()).cast(pa.timestamp("s", tz="UTC"))
+    end_ts = pa.scalar(sensor_store.to_epoch(end), pa.int64()).cast(pa.timestamp("s", tz="UTC"))
+    first_day = f"{sensor_store.from_epoch(sensor_store.to_epoch(start)):%Y-%m-%d}"
+    last_day = f"{sensor_store.from_epoch(sensor_store.to_epoch(end) - 1):%Y-%m-%d}"
+    return ((ds.field("date") >= first_day) & (ds.field("date") <= last_day)
+            & (ds.field("ts") >= start_ts) & (ds.field("ts") < end_ts))
+
+
+class ArchiveQuery:
+    """Read-only SensorQuery stand-in over an exported archive directory.
+
+    Supports the date-range reads the GUIs and batch tools make (not live
+    tailing). Results keep the channel order of the exported database.
+    """
+
+    def __init__(self, root):
+        self.db_path = root
+        self._dataset = None
+        self._channels = None
+
+    def dataset(self):
+        if self._dataset is None:
+            self._dataset = open_archive(self.db_path)
+        return self._dataset
+
+    @property
+    def channels(self):
+        if self._channels is None:
+            # Every file shares the exported channel dictionary
+            fragment = next(iter(self.dataset().get_fragments()), None)
+            if fragment is None:
+                self._channels = []
+            else:
+                column = fragment.head(1, columns=["channel"]).column("channel")
+                self._channels = column.chunk(0).dictionary.to_pylist()
+        return self._channels
+
+    def fetch_range(self, start, end, groups=None):
+        """Fetch start <= time < end as a QueryResult; groups optionally
+        restricts the read to some channel groups' partitions."""
+        pa = _arrow()
+        condition = _time_filter(pa, start, end)
+        if groups:
+            condition &= pa.dataset.field("group").isin(list(groups))
+        table = self.dataset().to_table(columns=["channel", "ts", "value"], filter=condition)
+        channels = self.channels
+        if table.num_rows == 0:
+            empty = np.empty(0)
+            return QueryResult(channels, empty.astype(np.intp), empty.astype(np.int64), empty)
+        channel = np.concatenate([c.indices.to_numpy() for c in table.column("channel").chunks])
+        ts = _epoch_seconds(pa, table.column("ts")).to_numpy()
+        value = table.column("value").to_numpy()
+        order = np.lexsort((ts, channel))
+        return QueryResult(channels, channel[order].astype(np.intp), ts[order],
+                           np.ascontiguousarray(value[order]))
+
+    def fetch_day(self, day):
+        start = datetime(day.year, day.month, day.day)
+        return self.fetch_range(start, start + timedelta(days=1))
+
+    def fetch_summary(self, start, end, points):
+        """Raw samples in SummaryResult form; archives carry no rollups."""
+        raw = self.fetch_range(start, end)
+        return SummaryResult(raw.channels, raw.channel, raw.ts, raw.value,
+                             raw.value, raw.value, np.ones(len(raw), dtype=np.int64), None)
+
+    def time_bounds(self):
+        pa = _arrow()
+        table = self.dataset().to_table(columns=["ts"])
+        if table.num_rows == 0:
+            return None, None
+        ts = _epoch_seconds(pa, table.column("ts"))
+        bounds = pa.compute.min_max(ts)
+        return bounds["min"].as_py(), bounds["max"].as_py()
+
+    def data_version(self):
+        """Archives are written once; their directory mtime stands in."""
+        return os.stat(self.db_path).st_mtime_ns
+
+    def close(self):
+        self._dataset = None
+
+
+def import_archive(root, db_path, start=None, end=None):
+    """Load an archive (optionally only start <= time < end) into a
+    consolidated store in one transaction.
+
+    Batches stream from the memory-mapped files straight into executemany.
+    Into an empty store the samples index is dropped for the load and
+    rebuilt once; otherwise batches go to a temporary table and only rows
+    the store does not hold yet (same channel, ts and value) are copied, so
+    overlapping or repeated imports add nothing twice. Existing rollups are
+    brought up to date. Returns (rows imported, rows skipped).
+    """
+    pa = _arrow()
+    archive = ArchiveQuery(root)
+    dataset = archive.dataset()
+    condition = None
+    if start is not None or end is not None:
+        first, last = archive.time_bounds()
+        condition = _time_filter(
+            pa,
+            start if start is not None else sensor_store.from_epoch(first),
+            end if end is not None else sensor_store.from_epoch(last + 1),
+        )
+
+    conn = sqlite3.connect(db_path)
+    try:
+        if sensor_store.legacy_channel_tables(conn) and not sensor_store.is_consolidated(conn):
+            raise ValueError(f"{db_path} uses the table-per-channel layout; import into a consolidated store")
+        sensor_store.create_schema(conn)
+        total = skipped = 0
+        dedupe = sensor_store.has_samples(conn)
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO channels (name) VALUES (?)", [(c,) for c in archive.channels]
+            )
+            ids = sensor_store.channel_ids(conn)
+            id_of = np.array([ids[c] for c in archive.channels], dtype=np.int64)
+            if dedupe:
+                conn.execute("CREATE TEMP TABLE incoming (channel INTEGER, ts INTEGER, value REAL)")
+                target = "temp.incoming"
+            else:
+                conn.execute("DROP INDEX IF EXISTS samples_channel_ts")
+                target = "samples"
+            scanner = dataset.scanner(columns=["channel", "ts", "value"], filter=condition,
+                                      batch_size=IMPORT_BATCH_ROWS)
+            for batch in scanner.to_batches():
+                if batch.num_rows == 0:
+                    continue
+                index = batch.column("channel").indices.to_numpy()
+                ts = _epoch_seconds(pa, batch.column("ts")).to_numpy()
+                value = batch.column("value").to_numpy(zero_copy_only=False)
+                conn.executemany(
+                    f"INSERT INTO {target} (channel, ts, value) VALUES (?, ?, ?)",
+                    zip(id_of[index].tolist(), ts.tolist(), value.tolist()),
+                )
+                total += batch.num_rows
+            if dedupe:
+                cursor = conn.execute(
+                    f"""INSERT INTO samples (channel, ts, value)
+                        SELECT channel, ts, value FROM temp.incoming AS new
+                        WHERE {sensor_store.NOT_STORED.format("new")}"""
+                )
+                skipped = total - cursor.rowcount
+                total = cursor.rowcount
+                conn.execute("DROP TABLE temp.incoming")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS samples_channel_ts ON samples (channel, ts, value)"
+            )
+        if rollups.has_rollups(conn):
+            rollups.update(conn)
+        conn.execute("ANALYZE")
+        return total, skipped
+    finally:
+        conn.close()
+
+
+def _parse_time(text):
+    return datetime.fromisoformat(text) if text else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export realtime_data.db to a columnar archive, or import one back.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="database -> day/group partitioned archive")
+    export.add_argument("db")
+    export.add_argument("out")
+    export.add_argument("--format", choices=FORMATS, default="parquet")
+    export.add_argument("--compression", default=None,
+                        help="codec (default zstd for parquet, lz4 for arrow; 'none' keeps arrow files mappable without copies)")
+    export.add_argument("--start", help="YYYY-MM-DD[ HH:MM:SS]")
+    export.add_argument("--end", help="YYYY-MM-DD[ HH:MM:SS], exclusive")
+
+    load = commands.add_parser("import", help="archive -> consolidated SQLite store")
+    load.add_argument("archive")
+    load.add_argument("db")
+    load.add_argument("--start", help="YYYY-MM-DD[ HH:MM:SS]")
+    load.add_argument("--end", help="YYYY-MM-DD[ HH:MM:SS], exclusive")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "export":
+            rows = export_archive(args.db, args.out, args.format, args.compression,
+                                  _parse_time(args.start), _parse_time(args.end))
+            print(f"Exported {rows} samples to {args.out}.")
+        else:
+            rows, skipped = import_archive(args.archive, args.db,
+                                           _parse_time(args.start), _parse_time(args.end))
+            print(f"Imported {rows} samples into {args.db}.")
+            if skipped:
+                print(f"Skipped {skipped} samples already in {args.db}.")
+    except (ImportError, ValueError, OSError, sqlite3.Error) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import os
+import sys
+import glob
+import time
+import argparse
+from multiprocessing import Pool
+
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from aggregates import STATISTICS, compute_stats, plot_statistic
+from downsample import COLUMN_RANGES, COLUMN_VIEWS, LodLines, sensor_pyramids
+from loader import read_sensor_file
+
+BEFORE_TAG = "do_vihoda"
+AFTER_TAG = "posle_vihoda"
+
+
+def find_pairs(source):
+    """Return (name, before, after) triples from a directory or a manifest.
+
+    A directory is searched recursively for *do_vihoda*.txt files whose
+    *posle_vihoda* counterpart exists. A manifest is a CSV with 'before' and
+    'after' columns and an optional 'name' column.
+    """
+    if os.path.isdir(source):
+        pairs = []
+        pattern = os.path.join(source, "**", f"*{BEFORE_TAG}*.txt")
+        for before in sorted(glob.glob(pattern, recursive=True)):
+            after = os.path.join(os.path.dirname(before),
+                                 os.path.basename(before).replace(BEFORE_TAG, AFTER_TAG))
+            if os.path.exists(after):
+                rel = os.path.relpath(before, source)
+                name = rel.replace(BEFORE_TAG, "").replace(".txt", "").strip("_-. ")
+                pairs.append((name.replace(os.sep, "_") or "pair", before, after))
+        return pairs
+
+    manifest = pd.read_csv(source)
+    base = os.path.dirname(os.path.abspath(source))
+    pairs = []
+    for i, row in manifest.iterrows():
+        before = os.path.join(base, row['before'])
+        after = os.path.join(base, row['after'])
+        name = row['name'] if 'name' in manifest.columns else f"pair_{i:04d}"
+        pairs.append((str(name), before, after))
+    return pairs
+
+
+def save_figure(fig, path):
+    FigureCanvasAgg(fig)
+    fig.savefig(path, dpi=100)
+
+
+def process_pair(task):
+    """Build every report artifact for one before/after pair (runs in a worker)."""
+    name, before_path, after_path, out_dir = task
+    started = time.perf_counter()
+    pair_dir = os.path.join(out_dir, name)
+    os.makedirs(pair_dir, exist_ok=True)
+    try:
+        before = read_sensor_file(before_path)
+        after = read_sensor_file(after_path)
+
+        for start, end in COLUMN_RANGES:
+            fig = Figure(figsize=(12, 6))
+            ax = fig.add_subplot(111)
+            view = f"Columns {start} to {end}"
+            LodLines(ax, sensor_pyramids(before, COLUMN_VIEWS[view]))
+            ax.set_title(view, fontsize=16, fontweight='bold')
+            ax.set_xlabel("Index", fontsize=12)
+            ax.set_ylabel("Value", fontsize=12)
+            ax.grid(True)
+            ax.legend(loc="best")
+            save_figure(fig, os.path.join(pair_dir, f"columns_{start:02d}_{end:02d}.png"))
+
+        datasets = [("Before", compute_stats(before)), ("After", compute_stats(after))]
+        for stat in ("mean", "median"):
+            fig = Figure(figsize=(12, 6))
+            ax = fig.add_subplot(111)
+            plot_statistic(ax, datasets, stat)
+            ax.set_xlabel("Sensor Number", fontsize=12)
+            ax.set_ylabel("U, mkV", fontsize=12)
+            save_figure(fig, os.path.join(pair_dir, f"{stat}.png"))
+
+        summary = pd.DataFrame({"sensor": datasets[0][1].labels})
+        for label, stats in datasets:
+            for stat in STATISTICS:
+                summary[f"{label.lower()}_{stat}"] = stats[stat]
+        summary.to_csv(os.path.join(pair_dir, "summary.csv"), index=False)
+        return name, True, time.perf_counter() - started, ""
+    except Exception as e:
+        return name, False, time.perf_counter() - started, str(e)
+
+
+def run(source, out_dir, processes=None):
+    """Process every pair found in source; returns (succeeded, failed) counts."""
+    pairs = find_pairs(source)
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [(name, before, after, out_dir) for name, before, after in pairs]
+    ok = failed = 0
+    with Pool(processes=processes) as pool:
+        for name, success, seconds, error in pool.imap_unordered(process_pair, tasks):
+            if success:
+                ok += 1
+                print(f"{name}: done in {seconds:.1f} s")
+            else:
+                failed += 1
+                print(f"{name}: failed: {error}")
+    return ok, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch before/after reports without the GUI.")
+    parser.add_argument("source", help="directory of med2-style exports or a CSV manifest")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    ok, failed = run(args.source, args.out, args.jobs)
+    print(f"{ok} pairs processed, {failed} failed.")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+import os
+import sys
+import json
+import atexit
+import time
+import shutil
+import sqlite3
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Point the parse cache at a private scratch directory so runs neither reuse
+# nor clear the user's cache (even one set in SAKT_CACHE_DIR); must be set
+# before parse_cache is imported
+BENCH_CACHE_DIR = tempfile.mkdtemp(prefix="sakt_bench_cache_")
+os.environ["SAKT_CACHE_DIR"] = BENCH_CACHE_DIR
+atexit.register(shutil.rmtree, BENCH_CACHE_DIR, ignore_errors=True)
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+import alignment
+import parse_cache
+import rollups
+import sensor_store
+from aggregates import StatsCache, compute_stats
+from downsample import COLUMN_VIEWS, LodLines, PyramidCache, sensor_pyramids
+from loader import read_sensor_file
+from query_engine import SensorQuery
+from sensor_registry import REGISTRY
+from sensor_map import draw_detectors
+from spectra import DEFAULT_OVERLAP, DEFAULT_WINDOW, SpectrumCache, compute_spectrum
+
+DEFAULT_ROWS = 200_000
+DEFAULT_REPEATS = 5
+DEFAULT_THRESHOLD = 0.20
+# Slowdowns smaller than this (seconds) are timer noise, not regressions
+MIN_DELTA = 0.001
+
+# GUI entry points: (script, main window class)
+GUI_SCRIPTS = {"merge": ("merge.py", "CombinedApp"), "gui_plot": ("gui plot.py", "DiagnosticParameterApp")}
+# Startup budgets in seconds, measured in a fresh interpreter: importing the
+# script, and importing it plus constructing and showing its window
+STARTUP_BUDGETS = {"import": 0.5, "window": 1.0}
+# Modules the GUIs must not load before the window is shown
+DEFERRED_MODULES = ("pandas", "matplotlib")
+
+_STARTUP_PROBE = r"""
+import sys, json, time, importlib.util
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location("startup_probe", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+imported = time.perf_counter() - started
+from PyQt5.QtWidgets import QApplication
+app = QApplication([])
+window = getattr(module, sys.argv[2])()
+window.show()
+shown = time.perf_counter() - started
+loaded = sorted(m for m in sys.argv[3:] if m in sys.modules)
+print(json.dumps({"import": imported, "window": shown, "loaded": loaded}))
+"""
+
+
+def make_text_export(path, rows, seed=0):
+    """Write a tab-separated export with a Time column and every registry sensor."""
+    rng = np.random.default_rng(seed)
+    names = REGISTRY.labels.tolist()
+    frame = pd.DataFrame(
+        50 + 10 * rng.standard_normal((rows, len(names))), columns=names
+    )
+    start = datetime(2024, 12, 1)
+    frame.insert(0, "Time", [(start + timedelta(seconds=5 * i)).strftime("%Y-%m-%d %H:%M:%S")
+                             for i in range(rows)])
+    frame.to_csv(path, sep="\t", index=False, float_format="%.6f")
+
+
+def make_legacy_db(path, days, cadence=60, seed=0):
+    """Write a table-per-channel database covering `days` days at `cadence` seconds."""
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(path)
+    start = datetime(2024, 12, 1)
+    times = [(start + timedelta(seconds=s)).strftime("%Y-%m-%d %H:%M:%S")
+             for s in range(0, days * 86400, cadence)]
+    with conn:
+        for table in REGISTRY.tables.tolist():
+            conn.execute(f'CREATE TABLE "{table}" (Time TEXT, Value REAL)')
+            values = (50 + 10 * rng.standard_normal(len(times))).tolist()
+            conn.executemany(f'INSERT INTO "{table}" VALUES (?, ?)', zip(times, values))
+    conn.close()
+    return start
+
+
+def timed(fn, repeats, setup=None):
+    """Run fn `repeats` times (calling setup before each) and return timings in seconds."""
+    times = []
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def summarize(times):
+    return {"median": statistics.median(times), "min": min(times), "repeats": len(times)}
+
+
+def probe_startup(script, window_class):
+    """Import a GUI script and show its window in a fresh offscreen interpreter.
+
+    Returns {"import": s, "window": s, "loaded": [deferred modules loaded]}.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    output = subprocess.run(
+        [sys.executable, "-c", _STARTUP_PROBE, os.path.join(here, script), window_class,
+         *DEFERRED_MODULES],
+        cwd=here, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_startup(repeats):
+    """Time startup of each GUI; returns (results, budget violations)."""
+    results = {}
+    violations = []
+    for name, (script, window_class) in GUI_SCRIPTS.items():
+        probes = [probe_startup(script, window_class) for _ in range(repeats)]
+        for phase, budget in STARTUP_BUDGETS.items():
+            result = summarize([p[phase] for p in probes])
+            results[f"startup_{phase}_{name}"] = result
+            if result["median"] > budget:
+                violations.append(f"{name} {phase} took {result['median'] * 1000:.0f} ms, "
+                                  f"budget {budget * 1000:.0f} ms")
+        for module in sorted({m for p in probes for m in p["loaded"]}):
+            violations.append(f"{name} loaded {module} before its window was shown")
+    return results, violations
+
+
+def run_benchmarks(rows, days, repeats, map_points):
+    """Build the synthetic data in a temporary directory and time every operation.
+
+    'cold' means the application's own caches (parse cache, stats and
+    pyramid memoization, pooled connections) are empty; the OS page cache
+    is not dropped.
+    """
+    results = {}
+    work = tempfile.mkdtemp(prefix="sakt_bench_")
+    try:
+        text = os.path.join(work, "med2_do_vihoda.txt")
+        make_text_export(text, rows)
+        legacy = os.path.join(work, "legacy.db")
+        start = make_legacy_db(legacy, days)
+        store = os.path.join(work, "store.db")
+        sensor_store.migrate(legacy, store)
+        conn = sqlite3.connect(store)
+        rollups.update(conn)
+        conn.close()
+        day = start + timedelta(days=days // 2)
+
+        results["load_text_pandas"] = summarize(timed(lambda: pd.read_table(text), repeats))
+        results["load_text_cold"] = summarize(timed(
+            lambda: read_sensor_file(text), repeats,
+            setup=lambda: parse_cache.clear(BENCH_CACHE_DIR)))
+        read_sensor_file(text)
+        results["load_text_warm"] = summarize(timed(lambda: read_sensor_file(text), repeats))
+        parse_cache.clear(BENCH_CACHE_DIR)
+
+        frame = read_sensor_file(text, cache=False)
+        results["stats_cold"] = summarize(timed(lambda: compute_stats(frame), repeats))
+        cache = StatsCache()
+        cache.stats(frame)
+        results["stats_warm"] = summarize(timed(lambda: cache.stats(frame), repeats))
+        results["mean_median_pandas"] = summarize(timed(
+            lambda: (frame.iloc[:, 1:].mean(), frame.iloc[:, 1:].median()), repeats))
+
+        results["spectra_cold"] = summarize(timed(lambda: compute_spectrum(frame), repeats))
+        spectra = SpectrumCache()
+        spectra.spectrum(frame, DEFAULT_WINDOW, DEFAULT_OVERLAP)
+        results["spectra_warm"] = summarize(timed(
+            lambda: spectra.spectrum(frame, DEFAULT_WINDOW, DEFAULT_OVERLAP), repeats))
+
+        def plot(pyramids):
+            fig = Figure(figsize=(12, 6), dpi=100)
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot(111)
+            LodLines(ax, pyramids)
+            ax.legend()
+            fig.canvas.draw()
+
+        view = next(iter(COLUMN_VIEWS))
+        results["plot_columns_cold"] = summarize(timed(
+            lambda: plot(sensor_pyramids(frame, COLUMN_VIEWS[view])), repeats))
+        pyramids = PyramidCache()
+        pyramids.pyramids(frame, view)
+        results["plot_columns_warm"] = summarize(timed(
+            lambda: plot(pyramids.pyramids(frame, view)), repeats))
+
+        for label, path in (("legacy", legacy), ("store", store)):
+            results[f"fetch_day_{label}_cold"] = summarize(timed(
+                lambda: SensorQuery(path).fetch_day(day), repeats))
+            query = SensorQuery(path)
+            query.fetch_day(day)
+            results[f"fetch_day_{label}_warm"] = summarize(timed(
+                lambda: query.fetch_day(day), repeats))
+            results[f"fetch_range_{label}_warm"] = summarize(timed(
+                lambda: query.fetch_range(start, start + timedelta(days=days)), repeats))
+            # One point per hour: the store reads the hourly rollup instead of
+            # every 1-minute sample, the legacy database falls back to raw
+            results[f"fetch_summary_{label}_warm"] = summarize(timed(
+                lambda: query.fetch_summary(start, start + timedelta(days=days), days * 24),
+                repeats))
+            aligned = lambda: alignment.fetch_aligned(query, start, start + timedelta(days=days), 60)
+            results[f"align_{label}_cold"] = summarize(timed(
+                aligned, repeats, setup=alignment.clear_cache))
+            results[f"align_{label}_warm"] = summarize(timed(aligned, repeats))
+            results[f"correlation_{label}"] = summarize(timed(
+                lambda: aligned().correlation(), repeats))
+            query.close()
+
+        rng = np.random.default_rng(0)
+        x = rng.integers(0, 1600, map_points)
+        y = rng.integers(0, 1200, map_points)
+        z = rng.random(map_points) * 30
+        base = np.full((1200, 1600, 3), 255, dtype=np.uint8)
+        results["map_render"] = summarize(timed(
+            lambda: draw_detectors(base.copy(), x, y, z), repeats))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+        parse_cache.clear(BENCH_CACHE_DIR)
+    return results
+
+
+def compare(current, baseline, threshold):
+    """Return [(name, baseline median, current median, ratio)] for regressions."""
+    regressions = []
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        ratio = result["median"] / max(old["median"], 1e-12)
+        if ratio > 1 + threshold and result["median"] - old["median"] > MIN_DELTA:
+            regressions.append((name, old["median"], result["median"], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark loading, queries, statistics, plotting and map rendering.")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="rows in the synthetic text export")
+    parser.add_argument("--days", type=int, default=7, help="days in the synthetic databases (1-minute cadence)")
+    parser.add_argument("--map-points", type=int, default=20_000)
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="saved results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before flagging, as a fraction")
+    parser.add_argument("--startup-only", action="store_true",
+                        help="only check GUI import and window startup against the budgets")
+    args = parser.parse_args()
+
+    results, violations = run_startup(args.repeats)
+    if not args.startup_only:
+        results.update(run_benchmarks(args.rows, args.days, args.repeats, args.map_points))
+
+    current = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "rows": args.rows,
+            "days": args.days,
+            "map_points": args.map_points,
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+
+    for name, result in current["results"].items():
+        print(f"{name:28s} {result['median'] * 1000:10.2f} ms (min {result['min'] * 1000:.2f} ms)")
+    print(f"Results written to {args.out}.")
+    for violation in violations:
+        print(f"OVER BUDGET {violation}")
+
+    failed = bool(violations)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for name, old, new, ratio in regressions:
+            print(f"REGRESSION {name}: {old * 1000:.2f} ms -> {new * 1000:.2f} ms ({ratio:.2f}x)")
+        if not regressions:
+            print(f"No regressions beyond {args.threshold:.0%} against {args.compare}.")
+        failed = failed or bool(regressions)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import threading
+import weakref
+
+import numpy as np
+
+from sensor_registry import GROUPS, REGISTRY
+
+# Upper bound on drawn points per line, whatever the axes width
+MAX_POINTS = 4000
+# Levels stop once a level has no more than this many buckets
+MIN_BUCKETS = 256
+# Column selector entry for the heatmap timeline in both GUIs
+HEATMAP_VIEW = "All Sensors (Heatmap)"
+# Colour limits of the heatmap timeline, as percentiles of the coarsest level
+HEATMAP_PERCENTILES = (1, 99)
+# Column ranges the selectors have always offered, as text export positions
+# (position 0 is Time, so position p holds sensor index p - 1)
+COLUMN_RANGES = [(0, 11), (12, 22), (22, 34), (33, 45), (45, 55)]
+# Column selector entries of both GUIs and the sensor indices each one plots
+COLUMN_VIEWS = {
+    f"Columns {start} to {end}": np.arange(max(start, 1) - 1, end - 1) for start, end in COLUMN_RANGES
+}
+COLUMN_VIEWS.update({f"{group} Subsystem": REGISTRY.group_indices(group) for group in GROUPS})
+
+
+class MinMaxPyramid:
+    """Decimation pyramid of one column: level k holds min/max of 2**k samples.
+
+    Levels are built once by pairwise reduction, so any zoom level can be
+    served by slicing the right level instead of rescanning the raw data.
+    The pyramid adds about the size of the raw column in memory.
+    """
+
+    def __init__(self, x, y):
+        x = np.asarray(x)
+        y = np.asarray(y)
+        self.levels = [(x, y, y)]
+        while len(self.levels[-1][0]) > MIN_BUCKETS:
+            lx, lo, hi = self.levels[-1]
+            n = len(lx) // 2 * 2
+            lo_next = np.fmin(lo[0:n:2], lo[1:n:2])
+            hi_next = np.fmax(hi[0:n:2], hi[1:n:2])
+            if n < len(lx):
+                # An odd last sample is carried up as a bucket of its own
+                lo_next = np.append(lo_next, lo[-1])
+                hi_next = np.append(hi_next, hi[-1])
+            self.levels.append((lx[::2], lo_next, hi_next))
+
+    @property
+    def x_range(self):
+        x = self.levels[0][0]
+        return (x[0], x[-1]) if len(x) else (0, 0)
+
+    def envelope(self, x0, x1, max_points=MAX_POINTS):
+        """Return (x, y) covering [x0, x1] with at most about max_points points.
+
+        Raw samples are returned when they fit; otherwise each bucket is
+        drawn as a vertical min-max segment, which keeps spikes visible.
+        """
+        raw_x = self.levels[0][0]
+        lo_i, hi_i = np.searchsorted(raw_x, [x0, x1])
+        count = hi_i - lo_i
+        level = 0
+        # Raw levels draw one point per sample, decimated ones two per bucket
+        while count * (2 if level else 1) > max_points and level + 1 < len(self.levels):
+            level += 1
+            count //= 2
+
+        lx, lo, hi = self.levels[level]
+        start, stop = np.searchsorted(lx, [x0, x1])
+        # One bucket either side so the line runs off the visible edges
+        start = max(start - 1, 0)
+        stop = min(stop + 1, len(lx))
+        if level == 0:
+            return lx[start:stop], lo[start:stop]
+        xs = np.repeat(lx[start:stop], 2)
+        ys = np.column_stack((lo[start:stop], hi[start:stop])).ravel()
+        return xs, ys
+
+
+def sensor_pyramids(frame, sensors, x=None, check=None):
+    """Build a MinMaxPyramid for each sensor column of a frame or ConcatView
+    whose registry index is in sensors, in column order.
+
+    Columns come from the frame's sensor block by integer position. x
+    defaults to the frame index when it is monotonic and to row positions
+    otherwise (a ConcatView has no single index). check, if given, is called
+    between columns (for cancellation).
+    """
+    positions, _, matrix = REGISTRY.block(frame, sensors)
+    if x is None:
+        index = getattr(frame, "index", None)
+        x = index.to_numpy() if index is not None and index.is_monotonic_increasing \
+            else np.arange(len(matrix))
+    labels = frame.columns[positions]
+    pyramids = []
+    for i, label in enumerate(labels):
+        if check is not None:
+            check()
+        pyramids.append((str(label), MinMaxPyramid(x, matrix[:, i])))
+    return pyramids
+
+
+class HeatmapPyramid:
+    """Decimation pyramid of all sensors at once for a heatmap timeline.
+
+    Level k is a (buckets, channels) float32 matrix holding the mean of 2**k
+    rows per bucket (the last bucket may be shorter), so any visible row
+    range can be served as an image at most a screen wide. x is the row
+    position. Coarser levels are row-major, so reducing pairs of rows is
+    cheap; only the small slice handed to imshow is transposed. The pyramid
+    adds about the size of the sensor columns in memory.
+    """
+
+    def __init__(self, labels, matrix, check=None):
+        self.labels = labels
+        level = np.asarray(matrix, dtype=np.float32)
+        self.rows = level.shape[0]
+        self.levels = [level]
+        while len(level) > MIN_BUCKETS:
+            if check is not None:
+                check()
+            n = len(level) // 2
+            a, b = level[0:2 * n:2], level[1:2 * n:2]
+            mean = np.empty((n + len(level) % 2, level.shape[1]), dtype=np.float32)
+            np.add(a, b, out=mean[:n])
+            mean[:n] *= np.float32(0.5)
+            if np.isnan(mean[:n]).any():
+                # Mean of each pair, or the one value that is not NaN
+                mean[:n] = np.where(np.isnan(a), b, np.where(np.isnan(b), a, mean[:n]))
+            if len(level) % 2:
+                mean[n] = level[-1]
+            self.levels.append(mean)
+            level = mean
+
+    def color_limits(self):
+        top = self.levels[-1]
+        if not np.isfinite(top).any():
+            return 0.0, 1.0
+        lo, hi = np.nanpercentile(top, HEATMAP_PERCENTILES)
+        return float(lo), float(hi if hi > lo else lo + 1)
+
+    def image(self, x0, x1, max_bins=MAX_POINTS):
+        """Return (matrix, left, right) covering rows [x0, x1] with at most
+        about max_bins columns; left and right are the outer bucket edges."""
+        lo_i = int(np.clip(np.floor(x0), 0, max(self.rows - 1, 0)))
+        hi_i = int(np.clip(np.ceil(x1) + 1, lo_i + 1, self.rows))
+        level = 0
+        while (hi_i - lo_i) >> level > max_bins and level + 1 < len(self.levels):
+            level += 1
+        size = 1 << level
+        start = lo_i // size
+        stop = -(-hi_i // size)
+        right = min(stop * size, self.rows)
+        return self.levels[level][start:stop].T, start * size - 0.5, right - 0.5
+
+
+def heatmap_pyramid(frame, check=None):
+    """Build a HeatmapPyramid over every sensor column of a frame or ConcatView,
+    labelled by sensor ID."""
+    _, sensors, matrix = REGISTRY.block(frame)
+    return HeatmapPyramid(REGISTRY.ids[sensors], matrix, check)
+
+
+class PyramidCache:
+    """Memoize column pyramids per (dataset, COLUMN_VIEWS entry) and heatmap
+    pyramids per dataset."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def pyramids(self, frame, view, check=None):
+        return self._memo((id(frame), view), frame,
+                          lambda: sensor_pyramids(frame, COLUMN_VIEWS[view], check=check))
+
+    def heatmap(self, frame, check=None):
+        return self._memo((id(frame), "heatmap"), frame, lambda: heatmap_pyramid(frame, check))
+
+    def _memo(self, key, frame, build):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0]() is frame:
+            return entry[1]
+        value = build()
+        ref = weakref.ref(frame, lambda _, key=key: self._forget(key))
+        with self._lock:
+            self._entries[key] = (ref, value)
+        return value
+
+    def _forget(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class LodLines:
+    """Line2D artists that re-decimate their pyramids whenever the x range changes."""
+
+    def __init__(self, ax, pyramids, max_points=MAX_POINTS):
+        self.ax = ax
+        self.max_points = max_points
+        self.pyramids = pyramids
+        self.lines = []
+        x0 = min((p.x_range[0] for _, p in pyramids), default=0)
+        x1 = max((p.x_range[1] for _, p in pyramids), default=0)
+        budget = self._budget()
+        for label, pyramid in pyramids:
+            xs, ys = pyramid.envelope(x0, x1, budget)
+            self.lines.extend(ax.plot(xs, ys, label=label))
+        self._cid = ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+    def _budget(self):
+        # About two points (a min and a max) per horizontal pixel
+        width = self.ax.get_window_extent().width
+        return int(min(self.max_points, max(2 * width, MIN_BUCKETS)))
+
+    def _on_xlim_changed(self, ax):
+        x0, x1 = sorted(ax.get_xlim())
+        budget = self._budget()
+        for line, (_, pyramid) in zip(self.lines, self.pyramids):
+            line.set_data(*pyramid.envelope(x0, x1, budget))
+        ax.figure.canvas.draw_idle()
+
+    def disconnect(self):
+        self.ax.callbacks.disconnect(self._cid)
+
+
+class HeatmapTimeline:
+    """One imshow image of every sensor against time, re-sliced on zoom.
+
+    The image never has more columns than the axes has pixels, so drawing
+    costs the same for any row count; colour limits stay fixed while
+    zooming so colours remain comparable.
+    """
+
+    def __init__(self, ax, pyramid, max_bins=MAX_POINTS, cmap='viridis'):
+        self.ax = ax
+        self.pyramid = pyramid
+        self.max_bins = max_bins
+        vmin, vmax = pyramid.color_limits()
+        data, left, right = pyramid.image(0, pyramid.rows - 1, self._budget())
+        channels = len(pyramid.labels)
+        self.image = ax.imshow(
+            data, aspect='auto', interpolation='nearest', cmap=cmap, vmin=vmin, vmax=vmax,
+            extent=(left, right, channels - 0.5, -0.5),
+        )
+        ticks = np.arange(0, channels, max(1, channels // 16))
+        ax.set_yticks(ticks)
+        ax.set_yticklabels([pyramid.labels[i] for i in ticks])
+        ax.set_xlim(left, right)
+        # Zooming must not make set_extent rescale the axes
+        ax.set_autoscale_on(False)
+        self._cid = ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
+    def _budget(self):
+        # One bucket per horizontal pixel
+        width = self.ax.get_window_extent().width
+        return int(min(self.max_bins, max(width, MIN_BUCKETS)))
+
+    def _on_xlim_changed(self, ax):
+        x0, x1 = sorted(ax.get_xlim())
+        data, left, right = self.pyramid.image(x0, x1, self._budget())
+        self.image.set_data(data)
+        channels = len(self.pyramid.labels)
+        self.image.set_extent((left, right, channels - 0.5, -0.5))
+        ax.figure.canvas.draw_idle()
+
+    def disconnect(self):
+        self.ax.callbacks.disconnect(self._cid)
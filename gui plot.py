@@ -1,14 +1,15 @@
 import sys
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QWidget, 
     QPushButton, QComboBox, QLabel, QMessageBox, QHBoxLayout
 )
 from PyQt5.QtGui import QFont, QPixmap, QPalette, QColor
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
+
+from aggregates import StatsCache, plot_statistic
+from downsample import COLUMN_VIEWS, HEATMAP_VIEW, HeatmapTimeline, LodLines, PyramidCache
+from panels import LazyFigure
+from workers import JobRunner
 
 class DiagnosticParameterApp(QMainWindow):
     def __init__(self):
@@ -17,10 +18,18 @@ class DiagnosticParameterApp(QMainWindow):
         self.setGeometry(100, 100, 800, 600)
         self.initUI()
 
-        # Load the data files at startup
-        self.df_combined = self.load_and_concatenate_data()
-        self.sakt_dfd2 = pd.read_table('med2_do_vihoda.txt')
-        self.sakt_dfp2 = pd.read_table('med2_posle_vihoda.txt')
+        # The data files load in the background once the window is up;
+        # pandas is imported by that job, not at startup
+        self.df_combined = None
+        self.sakt_dfd2 = None
+        self.sakt_dfp2 = None
+        self.stats_cache = StatsCache()
+        self.pyramid_cache = PyramidCache()
+        self.column_lines = None
+        self.jobs = JobRunner(self)
+        self.jobs.progress.connect(lambda key, percent, message: self.statusBar().showMessage(message))
+        self.jobs.idle.connect(lambda key: self.statusBar().clearMessage())
+        QTimer.singleShot(0, self.load_and_concatenate_data)
 
     def initUI(self):
         # Set font and colors
@@ -48,13 +57,7 @@ class DiagnosticParameterApp(QMainWindow):
         # Dropdown to select column ranges
         self.column_selector = QComboBox(self)
         self.column_selector.setFont(label_font)
-        self.column_selector.addItems([
-            "Columns 0 to 11",
-            "Columns 12 to 22",
-            "Columns 22 to 34",
-            "Columns 33 to 45",
-            "Columns 45 to 55"
-        ])
+        self.column_selector.addItems(list(COLUMN_VIEWS) + [HEATMAP_VIEW])
         self.column_selector.setStyleSheet("""
             QComboBox {
                 background-color: #e0f7fa;
@@ -153,18 +156,10 @@ class DiagnosticParameterApp(QMainWindow):
         layout.addWidget(self.median_button)
         layout.addWidget(self.reset_column_button)  # Add reset button for column plots
         layout.addWidget(self.reset_mean_median_button)  # Add reset button for mean/median plots
-        layout = QVBoxLayout()
-        layout.addWidget(self.logo)
-        layout.addWidget(self.label)
-        layout.addWidget(self.column_selector)
-        layout.addWidget(self.plot_button)
-        layout.addWidget(self.mean_button)
-        layout.addWidget(self.median_button)
 
-        # Create a widget for the matplotlib figure
-        self.figure = Figure()
-        self.canvas = FigureCanvas(self.figure)
-        layout.addWidget(self.canvas)
+        # Widget for the matplotlib figure, built once it is first shown
+        self.plot_view = LazyFigure()
+        layout.addWidget(self.plot_view)
 
         # Set layout in the main widget
         container = QWidget()
@@ -172,91 +167,151 @@ class DiagnosticParameterApp(QMainWindow):
         self.setCentralWidget(container)
 
     def load_and_concatenate_data(self):
-        """Load and concatenate data from the two files."""
-        try:
-            dfd2 = pd.read_table('med2_do_vihoda.txt')
-            dfp2 = pd.read_table('med2_posle_vihoda.txt')
-            df_combined = pd.concat([dfd2, dfp2])
-            print("Data loaded and concatenated successfully.")
-            return df_combined
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load data: {str(e)}")
-            sys.exit(1)
+        """Load and concatenate data from the two files in the background."""
+        self.jobs.submit(
+            "load", read_and_concatenate, 'med2_do_vihoda.txt', 'med2_posle_vihoda.txt',
+            on_done=self.on_data_loaded,
+            on_error=self.on_load_failed,
+        )
+
+    def on_data_loaded(self, frames):
+        self.sakt_dfd2, self.sakt_dfp2, self.df_combined = frames
+        print("Data loaded and concatenated successfully.")
+
+    def on_load_failed(self, message):
+        QMessageBox.critical(self, "Error", f"Failed to load data: {message}")
+        QApplication.instance().exit(1)
+
+    def closeEvent(self, event):
+        self.jobs.shutdown()
+        super().closeEvent(event)
 
     def plot_selected_columns(self):
         """Plot the columns based on the user's selection."""
         selection = self.column_selector.currentText()
 
-        # Determine the column range based on the selection
-        if selection == "Columns 0 to 11":
-            self.plot_columns(0, 11, selection)
-        elif selection == "Columns 12 to 22":
-            self.plot_columns(12, 22, selection)
-        elif selection == "Columns 22 to 34":
-            self.plot_columns(22, 34, selection)
-        elif selection == "Columns 33 to 45":
-            self.plot_columns(33, 45, selection)
-        elif selection == "Columns 45 to 55":
-            self.plot_columns(45, 55, selection)
-
-    def plot_columns(self, start_col, end_col, title):
-        """Plot the selected columns."""
-        try:
-            self.figure.clear()  # Clear the figure before plotting
-            ax = self.figure.add_subplot(111)
-            self.df_combined.iloc[:, start_col:end_col].plot(ax=ax)
-            ax.set_title(title, fontsize=16, fontweight='bold')
-            ax.set_xlabel("Index", fontsize=12)
-            ax.set_ylabel("Value", fontsize=12)
-            ax.grid(True)
-            ax.legend(loc="best")
-            self.canvas.draw()  # Refresh the canvas to show the new plot
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to plot: {str(e)}")
+        if selection == HEATMAP_VIEW:
+            self.plot_heatmap()
+        else:
+            self.plot_columns(selection)
+
+    def plot_columns(self, view):
+        """Plot the sensors of a column selector entry; the pyramids are
+        built in the background and only drawn here."""
+        if self.df_combined is None:
+            QMessageBox.critical(self, "Error", "Failed to plot: Data not loaded yet.")
+            return
+        self.jobs.submit(
+            "plot", prepare_columns, self.pyramid_cache, self.df_combined, view,
+            on_done=lambda pyramids: self.draw_columns(pyramids, view),
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to plot: {e}"),
+        )
+
+    def draw_columns(self, pyramids, view):
+        self.plot_view.figure.clear()  # Clear the figure before plotting
+        ax = self.plot_view.figure.add_subplot(111)
+        self.column_lines = LodLines(ax, pyramids)
+        ax.set_title(view, fontsize=16, fontweight='bold')
+        ax.set_xlabel("Index", fontsize=12)
+        ax.set_ylabel("Value", fontsize=12)
+        ax.grid(True)
+        ax.legend(loc="best")
+        self.plot_view.canvas.draw()  # Refresh the canvas to show the new plot
+
+    def plot_heatmap(self):
+        """Plot every sensor against time as one heatmap image."""
+        if self.df_combined is None:
+            QMessageBox.critical(self, "Error", "Failed to plot heatmap: Data not loaded yet.")
+            return
+        self.jobs.submit(
+            "plot", prepare_heatmap, self.pyramid_cache, self.df_combined,
+            on_done=self.draw_heatmap,
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to plot heatmap: {e}"),
+        )
+
+    def draw_heatmap(self, pyramid):
+        self.plot_view.figure.clear()
+        ax = self.plot_view.figure.add_subplot(111)
+        self.column_lines = HeatmapTimeline(ax, pyramid)
+        self.plot_view.figure.colorbar(self.column_lines.image, ax=ax)
+        ax.set_title(HEATMAP_VIEW, fontsize=16, fontweight='bold')
+        ax.set_xlabel("Index", fontsize=12)
+        ax.set_ylabel("Sensor", fontsize=12)
+        self.plot_view.canvas.draw()
 
     def plot_mean(self):
         """Plot the mean of sensor readings."""
-        try:
-            m1 = self.sakt_dfd2.loc[:, 'A01 10JEC13CY203':'A64 10JAB10CY210'].mean()
-            m2 = self.sakt_dfp2.loc[:, 'A01 10JEC13CY203':'A64 10JAB10CY210'].mean()
-
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
-            x1 = [x for x in range(len(m1))]
-            x2 = [x for x in range(len(m2))]
-
-            ax.set_title('Mean of Sensor Readings', fontsize=16)
-            ax.set_xlabel("Sensor Number", fontsize=12)
-            ax.set_ylabel("U, mkV", fontsize=12)
-            ax.scatter(x1, m1, label='Before', color='blue')
-            ax.scatter(x2, m2, label='After', color='red')
-            ax.legend()
-            ax.grid()
-            self.canvas.draw()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to plot mean: {str(e)}")
+        self.plot_statistic("mean", 'Mean of Sensor Readings')
 
     def plot_median(self):
         """Plot the median of sensor readings."""
-        try:
-            m1 = self.sakt_dfd2.loc[:, 'A01 10JEC13CY203':'A64 10JAB10CY210'].median()
-            m2 = self.sakt_dfp2.loc[:, 'A01 10JEC13CY203':'A64 10JAB10CY210'].median()
-
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
-            x1 = [x for x in range(len(m1))]
-            x2 = [x for x in range(len(m2))]
-
-            ax.set_title('Median of Sensor Readings', fontsize=16)
-            ax.set_xlabel("Sensor Number", fontsize=12)
-            ax.set_ylabel("U, mkV", fontsize=12)
-            ax.scatter(x1, m1, label='Before', color='blue')
-            ax.scatter(x2, m2, label='After', color='red')
-            ax.legend()
-            ax.grid()
-            self.canvas.draw()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to plot median: {str(e)}")
+        self.plot_statistic("median", 'Median of Sensor Readings')
+
+    def plot_statistic(self, stat, title):
+        """Plot a per-sensor statistic; the dataset stats are computed (or
+        taken from the cache) in the background."""
+        if self.sakt_dfd2 is None or self.sakt_dfp2 is None:
+            QMessageBox.critical(self, "Error", f"Failed to plot {stat}: Data not loaded yet.")
+            return
+        self.jobs.submit(
+            "plot", compute_stats, self.stats_cache,
+            [("Before", self.sakt_dfd2), ("After", self.sakt_dfp2)],
+            on_done=lambda datasets: self.draw_statistic(datasets, stat, title),
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to plot {stat}: {e}"),
+        )
+
+    def draw_statistic(self, datasets, stat, title):
+        self.plot_view.figure.clear()
+        ax = self.plot_view.figure.add_subplot(111)
+        plot_statistic(ax, datasets, stat)
+        ax.set_title(title, fontsize=16)
+        ax.set_xlabel("Sensor Number", fontsize=12)
+        ax.set_ylabel("U, mkV", fontsize=12)
+        self.plot_view.canvas.draw()
+
+    def reset_column_plots(self):
+        """Reset the column plots to start from zero."""
+        self.plot_view.figure.clear()
+        ax = self.plot_view.figure.add_subplot(111)
+        ax.set_ylim(0, 1)  # Set y-axis limits to start from zero
+        ax.set_title("Column Plots Reset", fontsize=16)
+        ax.set_xlabel("Index", fontsize=12)
+        ax.set_ylabel("Value", fontsize=12)
+        ax.grid(True)
+        self.plot_view.canvas.draw()
+
+    def reset_mean_median_plots(self):
+        """Reset the mean/median plots to start from zero."""
+        self.plot_view.figure.clear()
+        ax = self.plot_view.figure.add_subplot(111)
+        ax.set_ylim(0, 1)  # Set y-axis limits to start from zero
+        ax.set_title("Mean/Median Plots Reset", fontsize=16)
+        ax.set_xlabel("Sensor Number", fontsize=12)
+        ax.set_ylabel("U, mkV", fontsize=12)
+        ax.grid(True)
+        self.plot_view.canvas.draw()
+
+def read_and_concatenate(job, before_path, after_path):
+    """Worker job: parse the before/after exports once and combine them."""
+    from loader import load_pair
+    job.report(0, f"Loading {before_path} and {after_path}")
+    return load_pair(before_path, after_path, on_chunk=lambda rows: job.check())
+
+def prepare_columns(job, cache, df, view):
+    """Worker job: build (or reuse) decimation pyramids for a column selector entry."""
+    return cache.pyramids(df, view, check=job.check)
+
+def prepare_heatmap(job, cache, df):
+    """Worker job: build (or reuse) the all-sensor heatmap pyramid."""
+    return cache.heatmap(df, check=job.check)
+
+def compute_stats(job, cache, datasets):
+    """Worker job: all per-sensor statistics for each (label, frame) pair."""
+    result = []
+    for i, (label, df) in enumerate(datasets):
+        job.report(100 * i / len(datasets), f"Computing statistics for {label}")
+        result.append((label, cache.stats(df)))
+    return result
 
 def main():
     app = QApplication(sys.argv)
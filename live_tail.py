@@ -0,0 +1,145 @@
+import numpy as np
+
+# Samples kept per channel in live mode
+LIVE_CAPACITY = 2048
+
+
+class RingBuffers:
+    """Fixed-size per-channel ring buffers for (ts, value) samples.
+
+    Each sample is written twice, at i and i + capacity, so the newest
+    `capacity` samples of a channel are always one contiguous slice and
+    can be handed to Line2D.set_data without copying. Memory is fixed at
+    allocation time.
+    """
+
+    def __init__(self, channels, capacity=LIVE_CAPACITY):
+        self.capacity = capacity
+        self.ts = np.zeros((channels, 2 * capacity), dtype=np.int64)
+        self.values = np.full((channels, 2 * capacity), np.nan)
+        self.head = np.zeros(channels, dtype=np.int64)  # Next write position
+        self.count = np.zeros(channels, dtype=np.int64)
+
+    def extend(self, channel, ts, values):
+        """Append samples for one channel, keeping only the newest capacity."""
+        n = len(ts)
+        if n == 0:
+            return
+        if n > self.capacity:
+            ts, values, n = ts[-self.capacity:], values[-self.capacity:], self.capacity
+        pos = (self.head[channel] + np.arange(n)) % self.capacity
+        self.ts[channel, pos] = ts
+        self.ts[channel, pos + self.capacity] = ts
+        self.values[channel, pos] = values
+        self.values[channel, pos + self.capacity] = values
+        self.head[channel] = (self.head[channel] + n) % self.capacity
+        self.count[channel] = min(self.count[channel] + n, self.capacity)
+
+    def extend_result(self, result):
+        """Append every channel of a QueryResult (rows grouped by channel)."""
+        bounds = np.searchsorted(result.channel, np.arange(len(self.head) + 1))
+        for channel in np.flatnonzero(np.diff(bounds)):
+            lo, hi = bounds[channel], bounds[channel + 1]
+            self.extend(channel, result.ts[lo:hi], result.value[lo:hi])
+
+    def view(self, channel):
+        """Return the buffered (ts, values) of a channel, oldest first."""
+        count = self.count[channel]
+        start = self.head[channel] + self.capacity - count
+        return self.ts[channel, start:start + count], self.values[channel, start:start + count]
+
+    def latest(self):
+        """Return the newest timestamp over all channels, or None."""
+        if not self.count.any():
+            return None
+        last = (self.head - 1) % self.capacity
+        has_data = self.count > 0
+        return int(self.ts[has_data, last[has_data]].max())
+
+
+class LiveTail:
+    """Poll a SensorQuery for new rows and keep them in ring buffers."""
+
+    def __init__(self, query, capacity=LIVE_CAPACITY):
+        self.query = query
+        self.buffers = RingBuffers(len(query.channels), capacity)
+        # Start about capacity rows per channel back so the plot opens with
+        # recent history; the consolidated store shares one rowid sequence
+        latest = query.latest_rowids()
+        if query.shared_rowids:
+            self.watermarks = np.maximum(latest - capacity * len(latest), 0)
+        else:
+            self.watermarks = np.maximum(latest - capacity, 0)
+
+    def poll(self):
+        """Fetch rows newer than the watermarks; returns the number added."""
+        result, self.watermarks = self.query.fetch_newer(self.watermarks)
+        self.buffers.extend_result(result)
+        return len(result)
+
+
+class LivePlot:
+    """Line2D per channel updated with set_data and blitting.
+
+    The figure is only fully redrawn when the data leaves the current axes
+    limits; every other refresh restores the cached background and redraws
+    just the lines.
+    """
+
+    def __init__(self, figure, canvas, labels):
+        self.figure = figure
+        self.canvas = canvas
+        self.figure.clear()
+        self.ax = self.figure.add_subplot(111)
+        self.ax.set_title("Live Sensor Data")
+        self.ax.set_xlabel("Time, s")
+        self.ax.set_ylabel("U, mkV")
+        self.ax.grid()
+        self.lines = [
+            self.ax.plot([], [], linewidth=0.8, label=label, animated=True)[0]
+            for label in labels
+        ]
+        self.background = None
+        self._cid = self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        for line in self.lines:
+            self.ax.draw_artist(line)
+
+    def update(self, buffers):
+        """Push the buffered samples into the lines and repaint them."""
+        lo_y, hi_y = np.inf, -np.inf
+        for channel, line in enumerate(self.lines):
+            ts, values = buffers.view(channel)
+            line.set_data(ts, values)
+            if len(values):
+                lo_y = min(lo_y, np.nanmin(values))
+                hi_y = max(hi_y, np.nanmax(values))
+
+        latest = buffers.latest()
+        if latest is None:
+            return
+        oldest = min(
+            (buffers.view(c)[0][0] for c in range(len(self.lines)) if buffers.count[c]),
+            default=latest,
+        )
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        if self.background is None or latest > x1 or oldest > x0 + 0.5 * (x1 - x0) \
+                or lo_y < y0 or hi_y > y1:
+            # Data left the view: rescale once with headroom and redraw fully
+            span = max(latest - oldest, 1)
+            self.ax.set_xlim(oldest, latest + 0.1 * span)
+            margin = 0.1 * max(hi_y - lo_y, 1.0)
+            self.ax.set_ylim(lo_y - margin, hi_y + margin)
+            self.canvas.draw()
+            return
+
+        self.canvas.restore_region(self.background)
+        for line in self.lines:
+            self.ax.draw_artist(line)
+        self.canvas.blit(self.ax.bbox)
+
+    def disconnect(self):
+        self.canvas.mpl_disconnect(self._cid)
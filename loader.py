@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+import parse_cache
+from sensor_registry import REGISTRY, sensor_frame
+
+CHUNK_ROWS = 100_000
+
+
+def read_sensor_file(path, chunksize=CHUNK_ROWS, on_chunk=None, cache=True):
+    """Parse a tab-separated export once, in chunks, with float32 sensors.
+
+    The header is read first so the parser produces float32 directly for the
+    sensor columns instead of materialising float64 and converting; the
+    sensors then sit in one contiguous (rows, sensors) block that
+    SensorRegistry.block hands out without copying. The block is allocated
+    once from a line count and each chunk is written straight into it, so
+    peak memory stays about one copy of the data plus one chunk. on_chunk,
+    if given, is called with the number of rows read so far after each chunk
+    (a worker job can use it to report progress or stop).
+
+    With cache=True an unchanged file is opened from parse_cache instead of
+    being parsed again, and a fresh parse is stored there for next time.
+    """
+    if cache:
+        frame = parse_cache.get(path)
+        if frame is not None:
+            return frame
+    frame = _parse_sensor_file(path, chunksize, on_chunk)
+    if cache:
+        try:
+            parse_cache.put(path, frame)
+        except OSError as e:
+            print(f"Could not cache {path}: {e}")
+    return frame
+
+
+def _count_lines(path, block_size=1 << 20):
+    """Count the lines of a file (a last line without a newline counts too)."""
+    count = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            count += block.count(b"\n")
+            last = block[-1:]
+    return count + (last != b"\n")
+
+
+def _parse_sensor_file(path, chunksize, on_chunk):
+    header = pd.read_table(path, nrows=0).columns
+    positions, _ = REGISTRY.locate(header)
+    sensors = [header[p] for p in positions]
+    others = header.delete(positions).tolist()
+    # Every line but the header is at most one row (blank lines are skipped)
+    matrix = np.empty((max(_count_lines(path) - 1, 0), len(sensors)), dtype=np.float32, order="F")
+    rest = []
+    rows = 0
+    for chunk in pd.read_table(path, dtype=dict.fromkeys(sensors, np.float32), chunksize=chunksize):
+        end = rows + len(chunk)
+        if end > len(matrix):
+            # Only if the line count was short (e.g. quoted newlines): grow geometrically
+            grown = np.empty((max(end, 2 * len(matrix)), len(sensors)), dtype=np.float32, order="F")
+            grown[:rows] = matrix[:rows]
+            matrix = grown
+        for i, p in enumerate(positions):
+            matrix[rows:end, i] = chunk.iloc[:, p].to_numpy()
+        rest.append(chunk[others])
+        rows = end
+        if on_chunk is not None:
+            on_chunk(rows)
+    if rows < len(matrix):
+        matrix = np.asfortranarray(matrix[:rows])
+    rest = pd.concat(rest, ignore_index=True) if rest else pd.DataFrame(columns=others)
+    return sensor_frame(header, matrix, {c: rest[c] for c in others})
+
+
+class ConcatView:
+    """Row-wise concatenation of frames that does not copy them.
+
+    Nothing is joined until a caller asks: SensorRegistry.block stacks just
+    the sensors it is given from each frame's sensor block. columns (and so
+    column positions and labels) are those of the first frame.
+    """
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+        self.columns = self.frames[0].columns if self.frames else pd.Index([])
+
+    @property
+    def empty(self):
+        return all(frame.empty for frame in self.frames)
+
+    @property
+    def shape(self):
+        return sum(len(frame) for frame in self.frames), len(self.columns)
+
+    def __len__(self):
+        return self.shape[0]
+
+
+def load_pair(before_path, after_path, on_chunk=None):
+    """Parse the before/after exports once each and build their combined view."""
+    before = read_sensor_file(before_path, on_chunk=on_chunk)
+    after = read_sensor_file(after_path, on_chunk=on_chunk)
+    return before, after, ConcatView([before, after])
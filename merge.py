@@ -1,16 +1,31 @@
 import sys
-import sqlite3
-import pandas as pd
-import random
-from datetime import datetime, timedelta
+from datetime import datetime
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QGridLayout, QPushButton,
-    QLabel, QWidget, QComboBox, QTableWidget, QTableWidgetItem, QTextEdit, QDateEdit, QFileDialog
+    QLabel, QWidget, QComboBox, QTableWidget, QTableWidgetItem, QTextEdit, QDateEdit, QFileDialog,
+    QProgressBar
 )
 from PyQt5.QtGui import QFont, QPixmap, QPalette, QColor
-from PyQt5.QtCore import Qt, QDate
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from PyQt5.QtCore import Qt, QDate, QTimer
+
+from query_engine import get_query
+from sensor_store import from_epoch
+from aggregates import STATISTICS, StatsCache, plot_statistic
+from downsample import COLUMN_VIEWS, HEATMAP_VIEW, HeatmapTimeline, LodLines, PyramidCache
+from live_tail import LivePlot, LiveTail
+from noise_detector import detect_noise
+from spectra import DEFAULT_OVERLAP, DEFAULT_WINDOW, OVERLAPS, WINDOW_SIZES, SpectrumCache, plot_band_trends, plot_heatmap
+from panels import LazyFigure
+from workers import JobRunner
+from tracing import TRACER, current_rss, span
+
+DB_PATH = "realtime_data.db"
+LIVE_INTERVAL_MS = 1000
+# Rows shown in the noise results table, strongest events first
+MAX_NOISE_ROWS = 200
+PERF_REFRESH_MS = 1000
+# Recent spans listed in the performance panel
+PERF_RECENT_ROWS = 30
 
 class CombinedApp(QMainWindow):
     def __init__(self):
@@ -33,19 +48,64 @@ class CombinedApp(QMainWindow):
         self.noise_analysis_widget = self.create_noise_analysis_widget()
         main_layout.addWidget(self.noise_analysis_widget, 1, 0)
 
-        # Section 4: Empty Space (Reserved for Future Use)
-        self.empty_widget = QLabel("Reserved for future use", alignment=Qt.AlignCenter)
-        self.empty_widget.setFont(QFont("Arial", 14, QFont.Bold))
-        main_layout.addWidget(self.empty_widget, 1, 1)
+        # Section 4: Performance of loads, queries, aggregations and draws
+        self.performance_widget = self.create_performance_widget()
+        main_layout.addWidget(self.performance_widget, 1, 1)
 
         # Set main layout
         container = QWidget()
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
-        # Load data files
-        self.sakt_dfd2 = pd.DataFrame()
-        self.sakt_dfp2 = pd.DataFrame()
+        # Background jobs with progress and cancel in the status bar
+        self.jobs = JobRunner(self)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_jobs)
+        self.statusBar().addPermanentWidget(self.progress_bar)
+        self.statusBar().addPermanentWidget(self.cancel_button)
+        self.jobs.progress.connect(self.show_job_progress)
+        self.jobs.idle.connect(self.hide_job_progress)
+        self.hide_job_progress()
+
+        # Data files are loaded on demand; pandas is imported with the first load
+        self.sakt_dfd2 = None
+        self.sakt_dfp2 = None
+        self.stats_cache = StatsCache()
+        self.spectrum_cache = SpectrumCache()
+        self.pyramid_cache = PyramidCache()
+        self.column_lines = None
+        self.realtime_data = None
+
+    def show_job_progress(self, key, percent, message):
+        self.progress_bar.setValue(percent)
+        self.progress_bar.show()
+        self.cancel_button.show()
+        if message:
+            self.statusBar().showMessage(message)
+
+    def hide_job_progress(self, key=None):
+        if self.jobs.running():
+            return  # Another job (e.g. a load during live mode) is still reporting
+        self.progress_bar.hide()
+        self.cancel_button.hide()
+        self.statusBar().clearMessage()
+
+    def cancel_jobs(self):
+        # Live polls are left alone: they are short, and a dropped poll would
+        # never clear live_pending
+        for key in self.jobs.running():
+            if key != "live":
+                self.jobs.cancel(key)
+        print("Background jobs canceled.")
+
+    def closeEvent(self, event):
+        self.live_timer.stop()
+        self.perf_timer.stop()
+        self.jobs.shutdown()
+        super().closeEvent(event)
+
     def toggle_dark_mode(self):
         palette = self.palette()
         palette.setColor(QPalette.Window, QColor(53, 53, 53))
@@ -66,13 +126,7 @@ class CombinedApp(QMainWindow):
         layout.addWidget(self.load_button)
 
         self.column_selector = QComboBox()
-        self.column_selector.addItems([
-            "Columns 0 to 11",
-            "Columns 12 to 22",
-            "Columns 22 to 34",
-            "Columns 33 to 45",
-            "Columns 45 to 55"
-        ])
+        self.column_selector.addItems(list(COLUMN_VIEWS) + [HEATMAP_VIEW])
         layout.addWidget(self.column_selector)
 
         self.plot_button = QPushButton("Plot Selected Columns")
@@ -84,9 +138,9 @@ class CombinedApp(QMainWindow):
         self.reset_column_button.clicked.connect(self.reset_column_plots)
         layout.addWidget(self.reset_column_button)
 
-        self.figure = Figure()
-        self.canvas = FigureCanvas(self.figure)
-        layout.addWidget(self.canvas)
+        # Figure and canvas are built once the panel is first shown
+        self.column_view = LazyFigure()
+        layout.addWidget(self.column_view)
 
         widget.setLayout(layout)
         return widget
@@ -105,6 +159,7 @@ class CombinedApp(QMainWindow):
         layout.addWidget(self.date_picker)
 
         self.fetch_button = QPushButton("Fetch Data for Selected Date")
+        self.fetch_button.clicked.connect(self.fetch_selected_date)
         layout.addWidget(self.fetch_button)
 
         self.results_table = QTableWidget()
@@ -118,6 +173,23 @@ class CombinedApp(QMainWindow):
         self.result_display.setReadOnly(True)
         layout.addWidget(self.result_display)
 
+        # Live mode: poll the database for new rows and update the lines in place
+        self.live_button = QPushButton("Start Live Mode")
+        self.live_button.setCheckable(True)
+        self.live_button.toggled.connect(self.toggle_live_mode)
+        layout.addWidget(self.live_button)
+
+        self.live_view = LazyFigure()
+        layout.addWidget(self.live_view)
+
+        self.live_timer = QTimer(self)
+        self.live_timer.setInterval(LIVE_INTERVAL_MS)
+        self.live_timer.timeout.connect(self.poll_live_data)
+        self.live_tail = None
+        self.live_plot = None
+        # True from submitting a poll until its result has been drawn
+        self.live_pending = False
+
         widget.setLayout(layout)
         return widget
 
@@ -138,18 +210,136 @@ class CombinedApp(QMainWindow):
         self.median_button.clicked.connect(self.plot_median)
         layout.addWidget(self.median_button)
 
+        # Any other per-sensor statistic; all of them are computed together
+        self.stat_selector = QComboBox()
+        for stat, name in STATISTICS.items():
+            self.stat_selector.addItem(name, stat)
+        self.stat_selector.activated.connect(
+            lambda index: self.plot_statistic(self.stat_selector.itemData(index))
+        )
+        layout.addWidget(self.stat_selector)
+
+        # Spectral analysis of all channels at once, cached per dataset and setting
+        spectral_layout = QHBoxLayout()
+        self.window_selector = QComboBox()
+        for size in WINDOW_SIZES:
+            self.window_selector.addItem(f"Window {size}", size)
+        self.window_selector.setCurrentIndex(WINDOW_SIZES.index(DEFAULT_WINDOW))
+        spectral_layout.addWidget(self.window_selector)
+
+        self.overlap_selector = QComboBox()
+        for overlap in OVERLAPS:
+            self.overlap_selector.addItem(f"Overlap {overlap:.0%}", overlap)
+        self.overlap_selector.setCurrentIndex(OVERLAPS.index(DEFAULT_OVERLAP))
+        spectral_layout.addWidget(self.overlap_selector)
+
+        self.spectrum_button = QPushButton("Plot Spectrum Heatmap")
+        self.spectrum_button.clicked.connect(lambda: self.plot_spectra("heatmap"))
+        spectral_layout.addWidget(self.spectrum_button)
+
+        self.band_power_button = QPushButton("Plot Band Power Trends")
+        self.band_power_button.clicked.connect(lambda: self.plot_spectra("bands"))
+        spectral_layout.addWidget(self.band_power_button)
+        layout.addLayout(spectral_layout)
+
         # Button to reset mean/median plots
         self.reset_mean_median_button = QPushButton("Reset Mean/Median Plots")
         self.reset_mean_median_button.clicked.connect(self.reset_mean_median_plots)
         layout.addWidget(self.reset_mean_median_button)
 
-        self.analysis_figure = Figure()
-        self.analysis_canvas = FigureCanvas(self.analysis_figure)
-        layout.addWidget(self.analysis_canvas)
+        self.analysis_view = LazyFigure()
+        layout.addWidget(self.analysis_view)
 
         widget.setLayout(layout)
         return widget
 
+    def create_performance_widget(self):
+        """Create the performance panel fed by the tracing layer."""
+        widget = QWidget()
+        layout = QVBoxLayout()
+
+        title = QLabel("Performance")
+        title.setFont(QFont("Arial", 16, QFont.Bold))
+        layout.addWidget(title)
+
+        self.rss_label = QLabel()
+        layout.addWidget(self.rss_label)
+
+        # Rolling latency per operation
+        self.perf_summary_table = QTableWidget()
+        self.perf_summary_table.setColumnCount(6)
+        self.perf_summary_table.setHorizontalHeaderLabels([
+            "Operation", "Kind", "Count", "p50, ms", "p95, ms", "Last Rows"
+        ])
+        layout.addWidget(self.perf_summary_table)
+
+        # Most recent spans, newest first
+        self.perf_recent_table = QTableWidget()
+        self.perf_recent_table.setColumnCount(5)
+        self.perf_recent_table.setHorizontalHeaderLabels([
+            "Time", "Operation", "ms", "Rows", "Memory, MB"
+        ])
+        layout.addWidget(self.perf_recent_table)
+
+        buttons = QHBoxLayout()
+        self.dump_traces_button = QPushButton("Dump Traces")
+        self.dump_traces_button.clicked.connect(self.dump_traces)
+        buttons.addWidget(self.dump_traces_button)
+        self.clear_traces_button = QPushButton("Clear Traces")
+        self.clear_traces_button.clicked.connect(self.clear_traces)
+        buttons.addWidget(self.clear_traces_button)
+        layout.addLayout(buttons)
+
+        self.perf_timer = QTimer(self)
+        self.perf_timer.setInterval(PERF_REFRESH_MS)
+        self.perf_timer.timeout.connect(self.refresh_performance_panel)
+        self.perf_timer.start()
+
+        widget.setLayout(layout)
+        return widget
+
+    def refresh_performance_panel(self):
+        """Show process RSS, per-operation percentiles and the latest spans."""
+        rss = current_rss()
+        self.rss_label.setText(
+            "Process RSS: n/a" if rss is None else f"Process RSS: {rss / 2 ** 20:.1f} MB"
+        )
+
+        summary = sorted(TRACER.summary().items(), key=lambda item: -item[1][3])
+        self.perf_summary_table.setRowCount(len(summary))
+        for row, (name, (category, count, p50, p95, rows)) in enumerate(summary):
+            cells = [name, category, str(count), f"{p50 * 1000:.1f}", f"{p95 * 1000:.1f}",
+                     "" if rows is None else str(rows)]
+            for col, text in enumerate(cells):
+                self.perf_summary_table.setItem(row, col, QTableWidgetItem(text))
+
+        recent = TRACER.recent(PERF_RECENT_ROWS)
+        self.perf_recent_table.setRowCount(len(recent))
+        for row, record in enumerate(recent):
+            cells = [
+                datetime.fromtimestamp(record.start).strftime("%H:%M:%S"),
+                record.name,
+                f"{record.seconds * 1000:.1f}",
+                "" if record.rows is None else str(record.rows),
+                "" if record.mem_delta is None else f"{record.mem_delta / 2 ** 20:+.1f}",
+            ]
+            for col, text in enumerate(cells):
+                self.perf_recent_table.setItem(row, col, QTableWidgetItem(text))
+
+    def dump_traces(self):
+        """Save all recorded spans as a Chrome trace-event JSON file."""
+        try:
+            path, _ = QFileDialog.getSaveFileName(self, "Save Traces", "traces.json", "JSON Files (*.json)")
+            if path:
+                count = TRACER.dump(path)
+                print(f"Wrote {count} spans to {path}.")
+        except Exception as e:
+            print(f"Error saving traces: {e}")
+
+    def clear_traces(self):
+        TRACER.clear()
+        self.refresh_performance_panel()
+
     def load_data_files(self):
         """Load data files using a file dialog."""
         try:
@@ -157,98 +347,315 @@ class CombinedApp(QMainWindow):
             file2, _ = QFileDialog.getOpenFileName(self, "Open Data File 2", "", "Text Files (*.txt)")
 
             if file1 and file2:
-                self.sakt_dfd2 = pd.read_table(file1)
-                self.sakt_dfp2 = pd.read_table(file2)
-                print("Data files loaded successfully.")
+                self.jobs.submit(
+                    "load", read_data_files, file1, file2,
+                    on_done=self.on_data_files_loaded,
+                    on_error=lambda e: print(f"Error loading data files: {e}"),
+                )
             else:
                 print("File selection canceled.")
         except Exception as e:
             print(f"Error loading data files: {e}")
 
+    def on_data_files_loaded(self, frames):
+        self.sakt_dfd2, self.sakt_dfp2 = frames
+        print("Data files loaded successfully.")
+
+    def fetch_selected_date(self):
+        """Fetch all sensor channels for the date chosen in the date picker."""
+        day = self.date_picker.date().toPyDate()
+        self.jobs.submit(
+            "fetch", fetch_and_detect, DB_PATH, day,
+            on_done=lambda result: self.show_fetch_results(day, *result),
+            on_error=lambda e: print(f"Error fetching data: {e}"),
+        )
+
+    def show_fetch_results(self, day, result, events):
+        """Show a fetch summary and fill the noise table."""
+        self.realtime_data = result
+        with span("noise_table", "render", rows=min(len(events), MAX_NOISE_ROWS)):
+            self.fill_noise_table(result, events, day)
+
+    def fill_noise_table(self, result, events, day):
+        counts = result.counts()
+        active = int((counts > 0).sum())
+        self.result_display.setPlainText(
+            f"{day:%Y-%m-%d}: {len(result)} samples from {active} of "
+            f"{len(result.channels)} channels, {len(events)} noise events."
+        )
+
+        shown = min(len(events), MAX_NOISE_ROWS)
+        self.results_table.setRowCount(shown)
+        for row in range(shown):
+            when = from_epoch(events.ts[row])
+            self.results_table.setItem(row, 0, QTableWidgetItem(result.channels[events.channel[row]]))
+            self.results_table.setItem(row, 1, QTableWidgetItem(f"{events.peak[row]:.2f}"))
+            self.results_table.setItem(row, 2, QTableWidgetItem(f"{events.background[row]:.2f}"))
+            self.results_table.setItem(row, 3, QTableWidgetItem(f"{when:%Y-%m-%d %H:%M:%S}"))
+
+    def toggle_live_mode(self, enabled):
+        """Start or stop tailing the database."""
+        if not enabled:
+            # An in-flight poll is left to finish and draw, so live_pending clears
+            self.live_timer.stop()
+            self.live_button.setText("Start Live Mode")
+            return
+        try:
+            query = get_query(DB_PATH)
+            if self.live_tail is None:
+                self.live_tail = LiveTail(query)
+                self.live_plot = LivePlot(self.live_view.figure, self.live_view.canvas, query.channels)
+            self.live_button.setText("Stop Live Mode")
+            self.poll_live_data()
+            self.live_timer.start()
+        except Exception as e:
+            print(f"Error starting live mode: {e}")
+            self.live_button.setChecked(False)
+
+    def poll_live_data(self):
+        """Fetch new rows in the background unless the last poll has not been
+        drawn yet, so a new poll never writes the ring buffers while the
+        previous one is being drawn."""
+        if self.live_pending:
+            return
+        self.live_pending = True
+        self.jobs.submit(
+            "live", poll_live_tail, self.live_tail,
+            on_done=lambda added: self.draw_live_data(),
+            on_error=self.live_poll_failed,
+        )
+
+    def draw_live_data(self):
+        try:
+            with span("live_draw", "render"):
+                self.live_plot.update(self.live_tail.buffers)
+        finally:
+            self.live_pending = False
+
+    def live_poll_failed(self, e):
+        self.live_pending = False
+        print(f"Error polling live data: {e}")
+
     def plot_selected_columns(self):
         """Plot the selected columns from the combined data."""
         try:
             selection = self.column_selector.currentText()
-            # Extract start and end indices from the selection
-            parts = selection.split(' ')
-            start = int(parts[1])  # Convert the start index
-            end = int(parts[3])     # Convert the end index
-
-            if self.sakt_dfd2.empty:
+            if selection == HEATMAP_VIEW:
+                self.plot_heatmap()
+                return
+            if self.sakt_dfd2 is None or self.sakt_dfd2.empty:
                 raise ValueError("Data not loaded correctly.")
 
-            self.figure.clear()
-            ax = self.figure.add_subplot(111)
-            self.sakt_dfd2.iloc[:, start:end].plot(ax=ax)
-            ax.set_title(selection)
-            ax.grid()
-            self.canvas.draw()
+            self.jobs.submit(
+                "plot", prepare_columns, self.pyramid_cache, self.sakt_dfd2, selection,
+                on_done=lambda pyramids: self.draw_columns(pyramids, selection),
+                on_error=lambda e: print(f"Error plotting selected columns: {e}"),
+            )
         except ValueError as ve:
             print(f"ValueError: {ve}")
         except Exception as e:
             print(f"Error plotting selected columns: {e}")
 
-    def plot_mean(self):
-        """Plot the mean of sensor readings."""
+    def plot_heatmap(self):
+        """Plot every sensor against time as one heatmap image."""
         try:
-            if self.sakt_dfd2.empty or self.sakt_dfp2.empty:
+            if self.sakt_dfd2 is None or self.sakt_dfd2.empty:
                 raise ValueError("Data not loaded correctly.")
-
-            m1 = self.sakt_dfd2.loc[:, 'A01 10JEC13CY203':'A64 10JAB10CY210'].mean()
-            m2 = self.sakt_dfp2.loc[:, 'A01 10JEC13CY203':'A64 10JAB10CY210'].mean()
-
-            self.analysis_figure.clear()
-            ax = self.analysis_figure.add_subplot(111)
-            ax.scatter(range(len(m1)), m1, label='Before', color='blue')
-            ax.scatter(range(len(m2)), m2, label='After', color='red')
+            self.jobs.submit(
+                "plot", prepare_heatmap, self.pyramid_cache, self.sakt_dfd2,
+                on_done=self.draw_heatmap,
+                on_error=lambda e: print(f"Error plotting heatmap: {e}"),
+            )
+        except ValueError as ve:
+            print(f"ValueError: {ve}")
+        except Exception as e:
+            print(f"Error plotting heatmap: {e}")
+
+    def draw_heatmap(self, pyramid):
+        """Draw the heatmap timeline on the column plot canvas."""
+        with span("draw_heatmap", "render", rows=pyramid.rows):
+            self.column_view.figure.clear()
+            ax = self.column_view.figure.add_subplot(111)
+            self.column_lines = HeatmapTimeline(ax, pyramid)
+            self.column_view.figure.colorbar(self.column_lines.image, ax=ax)
+            ax.set_title(HEATMAP_VIEW)
+            ax.set_xlabel("Index")
+            self.column_view.canvas.draw()
+
+    def draw_columns(self, pyramids, title):
+        """Draw decimated column pyramids on the column plot canvas."""
+        with span("draw_columns", "render", rows=len(pyramids)):
+            self.column_view.figure.clear()
+            ax = self.column_view.figure.add_subplot(111)
+            self.column_lines = LodLines(ax, pyramids)
             ax.legend()
-            ax.set_title('Mean of Sensor Readings')
+            ax.set_title(title)
             ax.grid()
-            self.analysis_canvas.draw()
-        except Exception as e:
-            print(f"Error plotting mean: {e}")
+            self.column_view.canvas.draw()
+
+    def plot_mean(self):
+        """Plot the mean of sensor readings."""
+        self.plot_statistic("mean")
 
     def plot_median(self):
         """Plot the median of sensor readings."""
+        self.plot_statistic("median")
+
+    def datasets(self):
+        """Return the loaded datasets as (label, frame) pairs."""
+        return [("Before", self.sakt_dfd2), ("After", self.sakt_dfp2)]
+
+    def plot_statistic(self, stat):
+        """Plot a per-sensor statistic, computing the dataset stats if needed."""
         try:
-            if self.sakt_dfd2.empty or self.sakt_dfp2.empty:
+            datasets = self.datasets()
+            if any(df is None or df.empty for _, df in datasets):
                 raise ValueError("Data not loaded correctly.")
 
-            m1 = self.sakt_dfd2.loc[:, 'A01 10JEC13CY203':'A64 10JAB10CY210'].median()
-            m2 = self.sakt_dfp2.loc[:, 'A01 10JEC13CY203':'A64 10JAB10CY210'].median()
+            cached = [self.stats_cache.get(df) for _, df in datasets]
+            if all(stats is not None for stats in cached):
+                self.draw_statistic(list(zip([label for label, _ in datasets], cached)), stat)
+                return
 
-            self.analysis_figure.clear()
-            ax = self.analysis_figure.add_subplot(111)
-            ax.scatter(range(len(m1)), m1, label='Before', color='blue')
-            ax.scatter(range(len(m2)), m2, label='After', color='red')
-            ax.legend()
-            ax.set_title('Median of Sensor Readings')
-            ax.grid()
-            self.analysis_canvas.draw()
+            self.jobs.submit(
+                "analysis", compute_dataset_stats, self.stats_cache, datasets,
+                on_done=lambda result: self.draw_statistic(result, stat),
+                on_error=lambda e: print(f"Error plotting {stat}: {e}"),
+            )
         except Exception as e:
-            print(f"Error plotting median: {e}")
+            print(f"Error plotting {stat}: {e}")
+
+    def draw_statistic(self, datasets, stat):
+        with span("draw_statistic", "render", rows=len(datasets)):
+            self.analysis_view.figure.clear()
+            ax = self.analysis_view.figure.add_subplot(111)
+            plot_statistic(ax, datasets, stat)
+            self.analysis_view.canvas.draw()
+
+    def plot_spectra(self, view):
+        """Plot a spectral view ("heatmap" or "bands"), computing spectra if needed."""
+        try:
+            datasets = self.datasets()
+            if any(df is None or df.empty for _, df in datasets):
+                raise ValueError("Data not loaded correctly.")
+            window = self.window_selector.currentData()
+            overlap = self.overlap_selector.currentData()
+
+            cached = [self.spectrum_cache.get(df, window, overlap) for _, df in datasets]
+            if all(spectrum is not None for spectrum in cached):
+                self.draw_spectra(list(zip([label for label, _ in datasets], cached)), view)
+                return
+
+            self.jobs.submit(
+                "analysis", compute_dataset_spectra, self.spectrum_cache, datasets, window, overlap,
+                on_done=lambda result: self.draw_spectra(result, view),
+                on_error=lambda e: print(f"Error computing spectra: {e}"),
+            )
+        except Exception as e:
+            print(f"Error computing spectra: {e}")
+
+    def draw_spectra(self, datasets, view):
+        with span("draw_spectra", "render", rows=len(datasets)):
+            figure = self.analysis_view.figure
+            figure.clear()
+            axes = [figure.add_subplot(1, len(datasets), i + 1) for i in range(len(datasets))]
+            if view == "heatmap":
+                images = plot_heatmap(axes, datasets)
+                figure.colorbar(images[-1], ax=axes, label="dB")
+            else:
+                plot_band_trends(axes, datasets)
+            spectrum = datasets[0][1]
+            figure.suptitle(f"Window {spectrum.window}, overlap {spectrum.overlap:.0%}")
+            self.analysis_view.canvas.draw()
 
     def reset_column_plots(self):
         """Reset the column plots to start from zero."""
-        self.figure.clear()  # Clear the figure
-        ax = self.figure.add_subplot(111)
+        self.column_view.figure.clear()  # Clear the figure
+        ax = self.column_view.figure.add_subplot(111)
         ax.set_ylim(0, 1)  # Set y-axis limits to start from zero
         ax.set_title("Column Plots Reset", fontsize=16)
         ax.set_xlabel("Index", fontsize=12)
         ax.set_ylabel("Value", fontsize=12)
         ax.grid(True)
-        self.canvas.draw()  # Refresh the canvas
+        self.column_view.canvas.draw()  # Refresh the canvas
 
     def reset_mean_median_plots(self):
         """Reset the mean/median plots to start from zero."""
-        self.analysis_figure.clear()  # Clear the figure
-        ax = self.analysis_figure.add_subplot(111)
+        self.analysis_view.figure.clear()  # Clear the figure
+        ax = self.analysis_view.figure.add_subplot(111)
         ax.set_ylim(0, 1)  # Set y-axis limits to start from zero
         ax.set_title("Mean/Median Plots Reset", fontsize=16)
         ax.set_xlabel("Sensor Number", fontsize=12)
         ax.set_ylabel("U, mkV", fontsize=12)
         ax.grid(True)
-        self.analysis_canvas.draw()  # Refresh the canvas
+        self.analysis_view.canvas.draw()  # Refresh the canvas
+
+def fetch_and_detect(job, db_path, day):
+    """Worker job: fetch a day from the database and detect noise events."""
+    job.report(0, f"Fetching {day:%Y-%m-%d}")
+    with span("fetch_day", "io") as s:
+        result = get_query(db_path).fetch_day(day)
+        s.rows = len(result)
+    job.report(50, "Detecting noise events")
+    with span("detect_noise", "compute") as s:
+        # Each channel in its own sample order, so repeated timestamps and
+        # slow channels are checked sample by sample
+        times, matrix = result.sample_matrix()
+        s.rows = len(result)
+        events = detect_noise(times, matrix)
+    return result, events
+
+
+def poll_live_tail(job, tail):
+    """Worker job: pull rows added since the last poll into the ring buffers."""
+    with span("live_poll", "io") as s:
+        s.rows = tail.poll()
+    return s.rows
+
+
+def read_data_files(job, file1, file2):
+    """Worker job: parse both exported text files."""
+    from loader import read_sensor_file
+    frames = []
+    for i, path in enumerate((file1, file2)):
+        job.report(50 * i, f"Loading {path}")
+        with span("load_file", "io") as s:
+            frames.append(read_sensor_file(path, on_chunk=lambda rows: job.check()))
+            s.rows = len(frames[-1])
+    return tuple(frames)
+
+
+def prepare_columns(job, cache, df, view):
+    """Worker job: build (or reuse) decimation pyramids for a column selector entry."""
+    with span("column_pyramids", "compute", rows=len(df)):
+        return cache.pyramids(df, view, check=job.check)
+
+
+def prepare_heatmap(job, cache, df):
+    """Worker job: build (or reuse) the all-sensor heatmap pyramid."""
+    with span("heatmap_pyramid", "compute", rows=len(df)):
+        return cache.heatmap(df, check=job.check)
+
+
+def compute_dataset_stats(job, cache, datasets):
+    """Worker job: all per-sensor statistics for each (label, frame) pair."""
+    result = []
+    for i, (label, df) in enumerate(datasets):
+        job.report(100 * i / len(datasets), f"Computing statistics for {label}")
+        with span("sensor_stats", "compute", rows=len(df)):
+            result.append((label, cache.stats(df)))
+    return result
+
+
+def compute_dataset_spectra(job, cache, datasets, window, overlap):
+    """Worker job: spectra of every channel for each (label, frame) pair."""
+    result = []
+    for i, (label, df) in enumerate(datasets):
+        job.report(100 * i / len(datasets), f"Computing spectra for {label}")
+        with span("spectra", "compute", rows=len(df)):
+            result.append((label, cache.spectrum(df, window, overlap, check=job.check)))
+    return result
+
 
 def main():
     app = QApplication(sys.argv)
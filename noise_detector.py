@@ -0,0 +1,111 @@
+import warnings
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Rolling background window in samples (on the common time grid)
+BACKGROUND_WINDOW = 25
+# Peaks must exceed the background by this many robust standard deviations
+THRESHOLD_SIGMA = 3.0
+# Bound on the temporary (channels, chunk, window) array, in elements
+_CHUNK_ELEMENTS = 4_000_000
+# MAD -> standard deviation for normally distributed noise
+_MAD_SCALE = 1.4826
+
+
+class NoiseEvents:
+    """Detected noise events as parallel arrays, strongest first."""
+
+    def __init__(self, channel, peak, background, ts):
+        order = np.argsort(-peak, kind="stable")
+        self.channel = channel[order]
+        self.peak = peak[order]
+        self.background = background[order]
+        self.ts = ts[order]
+
+    def __len__(self):
+        return len(self.ts)
+
+
+def rolling_median(matrix, window=BACKGROUND_WINDOW, step=None):
+    """Centered rolling nanmedian along time for every channel at once.
+
+    The median is evaluated every `step` samples (default window // 5) and
+    held in between, which keeps a slowly varying background accurate at a
+    fraction of the cost. Edges are padded by repeating the first/last
+    column, and time is processed in chunks so the windowed view never
+    exceeds _CHUNK_ELEMENTS values.
+    """
+    channels, samples = matrix.shape
+    if samples == 0:
+        return matrix.astype(np.float64)
+    window = max(1, min(window, samples))
+    step = max(1, window // 5) if step is None else step
+    half = window // 2
+    padded = np.pad(matrix, ((0, 0), (half, window - 1 - half)), mode="edge")
+    windows = sliding_window_view(padded, window, axis=1)
+    centers = np.minimum(np.arange(step // 2, samples + step - 1, step), samples - 1)
+    median = np.nanmedian if np.isnan(matrix).any() else np.median
+
+    held = np.empty((channels, len(centers)))
+    chunk = max(1, _CHUNK_ELEMENTS // max(1, channels * window))
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        # Windows that are all padding give NaN, which is what we want
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for start in range(0, len(centers), chunk):
+            stop = min(start + chunk, len(centers))
+            held[:, start:stop] = median(windows[:, centers[start:stop]], axis=-1)
+    return np.repeat(held, step, axis=1)[:, :samples]
+
+
+def detect_noise(times, matrix, window=BACKGROUND_WINDOW, threshold=THRESHOLD_SIGMA):
+    """Find noise events in a (channels, samples) matrix in one batched pass.
+
+    times is either shared by all channels (samples,) or per channel
+    (channels, samples), as QueryResult.sample_matrix returns. The
+    background is a rolling median per channel; the noise scale is the
+    median absolute deviation from that background. Every contiguous run of
+    samples above background + threshold * scale is one event, reported at
+    its highest sample.
+    """
+    channels, samples = matrix.shape
+    if samples == 0:
+        empty = np.empty(0)
+        return NoiseEvents(empty.astype(np.intp), empty, empty, empty.astype(np.int64))
+    background = rolling_median(matrix, window)
+    residual = matrix - background
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        scale = _MAD_SCALE * np.nanmedian(np.abs(residual), axis=1, keepdims=True)
+        above = residual > threshold * np.maximum(scale, np.finfo(float).eps)
+
+    # A False column between channels keeps runs from crossing rows
+    mask = np.zeros((channels, samples + 1), dtype=bool)
+    mask[:, :samples] = above
+    flat = mask.ravel()
+    values = np.full((channels, samples + 1), -np.inf)
+    values[:, :samples] = np.where(above, matrix, -np.inf)
+    values = values.ravel()
+
+    prev = np.concatenate(([False], flat[:-1]))
+    starts = np.flatnonzero(flat & ~prev)
+    if len(starts) == 0:
+        return detect_noise(times, matrix[:, :0])
+
+    run_max = np.maximum.reduceat(values, starts)
+    # Label each element with its run; the first element equal to the run
+    # maximum marks the peak
+    run_id = np.cumsum(flat & ~prev) - 1
+    is_peak = flat & (values == run_max[run_id])
+    peak_pos = np.flatnonzero(is_peak)
+    _, first = np.unique(run_id[peak_pos], return_index=True)
+    peak_pos = peak_pos[first]
+
+    channel, sample = np.divmod(peak_pos, samples + 1)
+    times = np.asarray(times)
+    return NoiseEvents(
+        channel,
+        matrix[channel, sample],
+        background[channel, sample],
+        times[channel, sample] if times.ndim == 2 else times[sample],
+    )
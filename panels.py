@@ -0,0 +1,48 @@
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QVBoxLayout, QWidget
+
+
+class LazyFigure(QWidget):
+    """Placeholder that builds its matplotlib Figure and canvas on demand.
+
+    matplotlib is imported and the canvas created the first time `figure`
+    or `canvas` is used, or on the first event loop pass after the widget
+    is shown, so the window paints before any plotting code loads.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._figure = None
+        self._canvas = None
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+    @property
+    def created(self):
+        return self._canvas is not None
+
+    @property
+    def figure(self):
+        self.create()
+        return self._figure
+
+    @property
+    def canvas(self):
+        self.create()
+        return self._canvas
+
+    def create(self):
+        if self._canvas is not None:
+            return
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+
+        self._figure = Figure()
+        self._canvas = FigureCanvas(self._figure)
+        self.layout().addWidget(self._canvas)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._canvas is None:
+            QTimer.singleShot(0, self.create)
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+
+import numpy as np
+
+from sensor_registry import REGISTRY, sensor_frame
+
+# Parsed text exports are stored as one Fortran-ordered .npy matrix of the
+# sensor columns, one .npy file per other column and a meta.json sidecar,
+# and opened again with mmap so only touched pages load.
+CACHE_DIR = os.environ.get(
+    "SAKT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sakt_tool")
+)
+MAX_BYTES = int(os.environ.get("SAKT_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+META_FILE = "meta.json"
+SENSOR_FILE = "sensors.npy"
+FORMAT_VERSION = 2
+
+
+def file_hash(path, block_size=1 << 20):
+    """Return the BLAKE2b digest of a file's contents."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _entry_dir(path, cache_dir):
+    key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, key)
+
+
+def _read_meta(entry):
+    try:
+        with open(os.path.join(entry, META_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(entry, meta):
+    tmp = os.path.join(entry, META_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(entry, META_FILE))
+
+
+def _load_column(entry, col):
+    values = np.load(os.path.join(entry, col["file"]), mmap_mode="r")
+    if "missing" in col:
+        # Text columns store missing values as '' plus a mask
+        missing = np.load(os.path.join(entry, col["missing"]))
+        values = values.astype(object)
+        values[missing] = None
+    return values
+
+
+def get(path, cache_dir=CACHE_DIR):
+    """Return the cached frame for `path`, or None if missing or stale.
+
+    A matching size and mtime is trusted as-is. If only the mtime moved
+    (the file was touched or copied), the content hash decides.
+    """
+    entry = _entry_dir(path, cache_dir)
+    meta = _read_meta(entry)
+    if meta is None or meta.get("version") != FORMAT_VERSION:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if st.st_size != meta["size"]:
+        return None
+    if st.st_mtime_ns != meta["mtime_ns"]:
+        if file_hash(path) != meta["hash"]:
+            return None
+        meta["mtime_ns"] = st.st_mtime_ns
+
+    try:
+        matrix = np.load(os.path.join(entry, SENSOR_FILE), mmap_mode="r")
+        others = {col["name"]: _load_column(entry, col) for col in meta["columns"]}
+    except (OSError, ValueError):
+        return None
+    meta["last_used"] = time.time()
+    try:
+        _write_meta(entry, meta)
+    except OSError:
+        pass  # last_used only steers eviction; a read-only cache still serves hits
+    return sensor_frame(meta["order"], matrix, others)
+
+
+def put(path, frame, cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+    """Store a parsed frame for `path` and trim the cache to max_bytes."""
+    st = os.stat(path)
+    entry = _entry_dir(path, cache_dir)
+    tmp_entry = f"{entry}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_entry, ignore_errors=True)
+    os.makedirs(tmp_entry)
+
+    positions, _, matrix = REGISTRY.block(frame)
+    np.save(os.path.join(tmp_entry, SENSOR_FILE), matrix, allow_pickle=False)
+    is_sensor = np.zeros(len(frame.columns), dtype=bool)
+    is_sensor[positions] = True
+
+    columns = []
+    nbytes = matrix.nbytes
+    for i in np.flatnonzero(~is_sensor):
+        name = frame.columns[i]
+        column = frame.iloc[:, i]
+        values = column.to_numpy()
+        col = {"name": str(name), "file": f"col_{i:04d}.npy"}
+        if values.dtype.kind not in "biufcM":
+            # Text columns become fixed-width unicode so they can be mmapped;
+            # missing values are kept in a mask rather than stored as 'nan'
+            missing = column.isna().to_numpy()
+            if missing.any():
+                col["missing"] = f"col_{i:04d}_missing.npy"
+                np.save(os.path.join(tmp_entry, col["missing"]), missing, allow_pickle=False)
+                values = np.where(missing, "", values)
+            values = values.astype(str)
+        np.save(os.path.join(tmp_entry, col["file"]), values, allow_pickle=False)
+        columns.append(col)
+        nbytes += values.nbytes
+
+    _write_meta(tmp_entry, {
+        "version": FORMAT_VERSION,
+        "path": os.path.abspath(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "hash": file_hash(path),
+        "order": [str(c) for c in frame.columns],
+        "columns": columns,
+        "nbytes": nbytes,
+        "last_used": time.time(),
+    })
+    shutil.rmtree(entry, ignore_errors=True)
+    os.replace(tmp_entry, entry)
+    evict(cache_dir, max_bytes)
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_BYTES):
+    """Delete least recently used entries until the cache fits in max_bytes."""
+    try:
+        names = os.listdir(cache_dir)
+    except OSError:
+        return
+    entries = []
+    for name in names:
+        entry = os.path.join(cache_dir, name)
+        meta = _read_meta(entry)
+        if meta is not None:
+            entries.append((meta.get("last_used", 0), meta.get("nbytes", 0), entry))
+    total = sum(nbytes for _, nbytes, _ in entries)
+    for _, nbytes, entry in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= nbytes
+
+
+def clear(cache_dir=CACHE_DIR):
+    """Remove every cached entry."""
+    shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,366 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import rollups
+import sensor_store
+
+
+class QueryResult:
+    """Samples for many channels as flat NumPy arrays, grouped by channel.
+
+    `channel` holds indexes into `channels`; rows are ordered by channel and
+    then by time, so each channel occupies one contiguous slice.
+    """
+
+    def __init__(self, channels, channel, ts, value):
+        self.channels = channels
+        self.channel = channel
+        self.ts = ts
+        self.value = value
+
+    def __len__(self):
+        return len(self.ts)
+
+    def series(self, name):
+        """Return the (ts, value) arrays for one channel as views."""
+        idx = self.channels.index(name)
+        lo, hi = np.searchsorted(self.channel, [idx, idx + 1])
+        return self.ts[lo:hi], self.value[lo:hi]
+
+    def matrix(self):
+        """Return (times, matrix): all samples on the union of their timestamps.
+
+        matrix has shape (channels, len(times)); slots a channel has no sample
+        for are NaN, and repeated timestamps keep the last value read.
+        """
+        times, column = np.unique(self.ts, return_inverse=True)
+        matrix = np.full((len(self.channels), len(times)), np.nan)
+        matrix[self.channel, column] = self.value
+        return times, matrix
+
+    def sample_matrix(self):
+        """Return (ts, matrix): every sample of each channel in its own order.
+
+        Both have shape (channels, most samples of any channel); row c holds
+        channel c's samples left-aligned, padded with NaN values (and ts 0).
+        Unlike matrix(), repeated timestamps keep all their samples and slow
+        channels are not spread over other channels' times.
+        """
+        counts = self.counts()
+        width = int(counts.max()) if len(counts) else 0
+        ts = np.zeros((len(self.channels), width), dtype=np.int64)
+        matrix = np.full((len(self.channels), width), np.nan)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        position = np.arange(len(self.ts)) - starts[self.channel]
+        ts[self.channel, position] = self.ts
+        matrix[self.channel, position] = self.value
+        return ts, matrix
+
+    def _locate(self, grid):
+        """Return (idx, starts, ends): for each channel and grid time the row
+        of the last sample at or before it, plus each channel's row bounds.
+
+        Rows are sorted by (channel, ts), so one searchsorted over combined
+        channel/time keys serves every channel at once.
+        """
+        channels = np.arange(len(self.channels))
+        base = int(min(self.ts.min(), grid.min())) if len(grid) else int(self.ts.min())
+        span = int(max(self.ts.max(), grid.max() if len(grid) else 0)) - base + 1
+        keys = self.channel.astype(np.int64) * span + (self.ts - base)
+        wanted = channels.astype(np.int64)[:, None] * span + (grid - base)
+        idx = np.searchsorted(keys, wanted, side="right") - 1
+        bounds = np.searchsorted(self.channel, np.append(channels, len(channels)))
+        return idx, bounds[:-1, None], bounds[1:, None]
+
+    def asof(self, grid, tolerance=None):
+        """Return a (channels, len(grid)) matrix of the last value at or before
+        each grid time, NaN before a channel's first sample and, if tolerance
+        (seconds) is given, where that value is older than tolerance.
+        """
+        grid = np.asarray(grid, dtype=np.int64)
+        out = np.full((len(self.channels), len(grid)), np.nan)
+        if len(self.ts) == 0:
+            return out
+        idx, starts, _ = self._locate(grid)
+        valid = idx >= starts
+        if tolerance is not None:
+            valid &= grid - self.ts[np.where(valid, idx, 0)] <= tolerance
+        out[valid] = self.value[idx[valid]]
+        return out
+
+    def interp(self, grid, max_gap=None):
+        """Return a (channels, len(grid)) matrix linearly interpolated between
+        each channel's neighbouring samples.
+
+        Grid times outside a channel's first..last sample are NaN, as are
+        times inside a gap longer than max_gap seconds, if given.
+        """
+        grid = np.asarray(grid, dtype=np.int64)
+        out = np.full((len(self.channels), len(grid)), np.nan)
+        if len(self.ts) == 0:
+            return out
+        idx, starts, ends = self._locate(grid)
+        has_prev = idx >= starts
+        prev = np.where(has_prev, idx, 0)
+        t0 = self.ts[prev]
+        exact = has_prev & (t0 == grid)
+        between = has_prev & ~exact & (idx + 1 < ends)
+        if max_gap is not None:
+            between &= self.ts[np.where(between, idx + 1, 0)] - t0 <= max_gap
+        out[exact] = self.value[idx[exact]]
+        i = idx[between]
+        t0 = self.ts[i]
+        weight = (np.broadcast_to(grid, idx.shape)[between] - t0) / (self.ts[i + 1] - t0)
+        out[between] = self.value[i] + weight * (self.value[i + 1] - self.value[i])
+        return out
+
+    def counts(self):
+        """Return the number of samples per channel, in `channels` order."""
+        return np.bincount(self.channel, minlength=len(self.channels))
+
+
+class SummaryResult(QueryResult):
+    """A QueryResult of per-bucket aggregates; `value` holds bucket means.
+
+    resolution is the bucket width in seconds, or None for raw samples (in
+    which case vmin, vmax and value are the same array and count is 1).
+    """
+
+    def __init__(self, channels, channel, ts, value, vmin, vmax, count, resolution):
+        super().__init__(channels, channel, ts, value)
+        self.vmin = vmin
+        self.vmax = vmax
+        self.count = count
+        self.resolution = resolution
+
+
+class SensorQuery:
+    """Date-range reader over realtime_data.db with one reusable connection.
+
+    Works with both the legacy table-per-channel layout and the consolidated
+    store from sensor_store.py; either way a fetch is a single parameterized
+    SQL statement covering every channel.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()
+        self._channels = None
+        self._ids = None
+        self._legacy_sql = None
+        self._legacy_tail_sql = None
+
+    def connection(self):
+        """Open the read-only connection on first use and reuse it afterwards."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False
+            )
+            self._load_channels()
+        return self._conn
+
+    def _load_channels(self):
+        if sensor_store.is_consolidated(self._conn):
+            ids = sensor_store.channel_ids(self._conn)
+            self._channels = list(ids)
+            self._ids = list(ids.values())
+        else:
+            self._channels = sensor_store.legacy_channel_tables(self._conn)
+            # Every legacy table gets the same bounds, so the statement is
+            # built once and bound with 2 * len(channels) parameters
+            self._legacy_sql = " UNION ALL ".join(
+                f"""SELECT * FROM (SELECT {i}, CAST(strftime('%s', Time) AS INTEGER) AS ts, Value
+                    FROM "{name}" WHERE Time >= ? AND Time < ? ORDER BY Time)"""
+                for i, name in enumerate(self._channels)
+            )
+            self._legacy_tail_sql = " UNION ALL ".join(
+                f"""SELECT * FROM (SELECT {i}, rowid, CAST(strftime('%s', Time) AS INTEGER) AS ts, Value
+                    FROM "{name}" WHERE rowid > ? ORDER BY ts)"""
+                for i, name in enumerate(self._channels)
+            )
+
+    @property
+    def channels(self):
+        self.connection()
+        return self._channels
+
+    @property
+    def shared_rowids(self):
+        """True when all channels share one rowid sequence (consolidated store)."""
+        self.connection()
+        return self._legacy_sql is None
+
+    def fetch_range(self, start, end):
+        """Fetch all channels for start <= time < end as a QueryResult."""
+        with self._lock:
+            conn = self.connection()
+            if self._legacy_sql is None:
+                rows = sensor_store.read_range(conn, start, end, self._ids)
+            else:
+                bounds = (_as_text(start), _as_text(end)) * len(self._channels)
+                rows = conn.execute(self._legacy_sql, bounds).fetchall()
+        return self._to_result(rows)
+
+    def fetch_summary(self, start, end, points):
+        """Fetch start <= time < end at the coarsest resolution that still
+        yields `points` buckets (e.g. the plot width in pixels).
+
+        Uses the rollup tables of a consolidated store; anything else, or a
+        range too short for the finest rollup, falls back to raw samples.
+        """
+        resolution = rollups.choose_resolution(start, end, points)
+        with self._lock:
+            conn = self.connection()
+            use_rollup = resolution is not None and self._legacy_sql is None \
+                and rollups.has_rollups(conn)
+            if use_rollup:
+                rows = rollups.read_rollup(conn, resolution, start, end, self._ids)
+        if not use_rollup:
+            raw = self.fetch_range(start, end)
+            return SummaryResult(raw.channels, raw.channel, raw.ts, raw.value,
+                                 raw.value, raw.value, np.ones(len(raw), dtype=np.int64), None)
+        if not rows:
+            base = self._to_result(rows)
+            return SummaryResult(base.channels, base.channel, base.ts, base.value,
+                                 base.value, base.value, base.ts.copy(), resolution)
+        data = np.array(rows, dtype=np.float64)
+        base = self._to_result(data, columns=(0, 1, 4))
+        return SummaryResult(base.channels, base.channel, base.ts, base.value,
+                             data[:, 2], data[:, 3], data[:, 5].astype(np.int64), resolution)
+
+    def time_bounds(self):
+        """Return (first, last) sample times in epoch seconds, or (None, None)."""
+        with self._lock:
+            conn = self.connection()
+            if self._legacy_sql is None:
+                return conn.execute("SELECT MIN(ts), MAX(ts) FROM samples").fetchone()
+            bounds = [
+                conn.execute(f'SELECT MIN(Time), MAX(Time) FROM "{name}"').fetchone()
+                for name in self._channels
+            ]
+        firsts = [lo for lo, _ in bounds if lo is not None]
+        lasts = [hi for _, hi in bounds if hi is not None]
+        if not firsts:
+            return None, None
+        return sensor_store.to_epoch(min(firsts)), sensor_store.to_epoch(max(lasts))
+
+    def data_version(self):
+        """SQLite's data_version: changes whenever another connection commits."""
+        with self._lock:
+            return self.connection().execute("PRAGMA data_version").fetchone()[0]
+
+    def latest_rowids(self):
+        """Return the highest rowid per channel as an int64 array.
+
+        The consolidated store has one rowid sequence for all channels, so
+        every entry is the same there.
+        """
+        with self._lock:
+            conn = self.connection()
+            if self._legacy_sql is None:
+                (top,) = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM samples").fetchone()
+                return np.full(len(self._channels), top, dtype=np.int64)
+            return np.array([
+                conn.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM "{name}"').fetchone()[0]
+                for name in self._channels
+            ], dtype=np.int64)
+
+    def fetch_newer(self, watermarks):
+        """Fetch rows with rowid above each channel's watermark.
+
+        Returns (QueryResult, new watermarks). Rows within a channel are
+        ordered by time. Callers start from latest_rowids() (optionally
+        wound back to prefill) and pass the returned watermarks next time.
+        """
+        watermarks = np.asarray(watermarks, dtype=np.int64)
+        with self._lock:
+            conn = self.connection()
+            if self._legacy_sql is None:
+                marks = ", ".join("?" * len(self._ids))
+                rows = conn.execute(
+                    f"""SELECT channel, rowid, ts, value FROM samples
+                        WHERE rowid > ? AND channel IN ({marks})
+                        ORDER BY channel, ts""",
+                    (int(watermarks.min()), *self._ids),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    self._legacy_tail_sql, [int(w) for w in watermarks]
+                ).fetchall()
+        if not rows:
+            return self._to_result(rows), watermarks
+        data = np.array(rows, dtype=np.float64)
+        rowid = data[:, 1].astype(np.int64)
+        result = self._to_result(data, columns=(0, 2, 3))
+        new_marks = watermarks.copy()
+        if self._legacy_sql is None:
+            new_marks[:] = max(int(rowid.max()), int(watermarks.max()))
+        else:
+            np.maximum.at(new_marks, result.channel, rowid)
+        return result, new_marks
+
+    def fetch_day(self, day):
+        """Fetch the 24 hours starting at midnight of `day` (a date or datetime)."""
+        start = datetime(day.year, day.month, day.day)
+        return self.fetch_range(start, start + timedelta(days=1))
+
+    def _to_result(self, rows, columns=(0, 1, 2)):
+        """Build a QueryResult from rows or a float array; columns gives the
+        positions of the channel, ts and value fields."""
+        if len(rows) == 0:
+            empty = np.empty(0)
+            return QueryResult(self._channels, empty.astype(np.intp), empty.astype(np.int64), empty)
+        data = rows if isinstance(rows, np.ndarray) else np.array(rows, dtype=np.float64)
+        c_col, t_col, v_col = columns
+        channel = data[:, c_col].astype(np.intp)
+        if self._ids is not None:
+            # Store ids -> 0-based positions in self._channels
+            position = np.zeros(max(self._ids) + 1, dtype=np.intp)
+            position[self._ids] = np.arange(len(self._ids))
+            channel = position[channel]
+        return QueryResult(
+            self._channels,
+            channel,
+            data[:, t_col].astype(np.int64),
+            np.ascontiguousarray(data[:, v_col]),
+        )
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _as_text(value):
+    """Format a bound the way legacy Time columns are stored."""
+    if isinstance(value, str):
+        return value
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+_pool = {}
+_pool_lock = threading.Lock()
+
+
+def get_query(db_path):
+    """Return the shared SensorQuery for a database path.
+
+    A directory is taken to be a columnar archive from archive.py and gets
+    an ArchiveQuery with the same read methods.
+    """
+    with _pool_lock:
+        query = _pool.get(db_path)
+        if query is None:
+            if os.path.isdir(db_path):
+                from archive import ArchiveQuery
+                query = ArchiveQuery(db_path)
+            else:
+                query = SensorQuery(db_path)
+            _pool[db_path] = query
+        return query
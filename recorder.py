@@ -0,0 +1,215 @@
+import os
+import time
+import sqlite3
+import argparse
+
+import numpy as np
+
+import rollups
+import sensor_store
+from sensor_registry import REGISTRY
+
+# Rows buffered before one executemany/commit
+BATCH_ROWS = 20_000
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",        # Readers (the GUIs) never block the writer
+    "PRAGMA synchronous = NORMAL",      # Durable at checkpoints; safe with WAL
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",       # 64 MiB page cache
+    "PRAGMA wal_autocheckpoint = 10000",
+)
+
+
+class Recorder:
+    """Batching writer for realtime_data.db.
+
+    Samples for all channels are buffered and written with one executemany
+    per batch inside a transaction. Consolidated stores (and new files) get
+    rows in the samples table; legacy databases get rows in each channel's
+    own table. Timestamps are stored in whole seconds, so samples taken
+    within the same second share a timestamp and keep their insertion order.
+    With rollup=True a consolidated store's rollup tables are brought up to
+    date after every batch.
+    """
+
+    def __init__(self, db_path, channels=None, batch_rows=BATCH_ROWS, rollup=False):
+        self.db_path = db_path
+        self.batch_rows = batch_rows
+        self.rollup = rollup
+        self.conn = sqlite3.connect(db_path)
+        for pragma in PRAGMAS:
+            self.conn.execute(pragma)
+
+        existing = sensor_store.legacy_channel_tables(self.conn)
+        self.legacy = bool(existing) and not sensor_store.is_consolidated(self.conn)
+        if self.legacy:
+            self.channels = channels or existing
+        else:
+            sensor_store.create_schema(self.conn)
+            names = channels or list(sensor_store.channel_ids(self.conn))
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO channels (name) VALUES (?)", [(n,) for n in names]
+                )
+            ids = sensor_store.channel_ids(self.conn)
+            self.channels = names
+            self.channel_ids = np.array([ids[n] for n in names], dtype=np.int64)
+
+        self._ts = []
+        self._values = []
+        self._pending = 0
+        self.rows_written = 0
+        self.write_seconds = 0.0
+
+    def add(self, ts, values):
+        """Queue one sample per channel taken at epoch second ts."""
+        self.add_block(np.array([ts]), np.asarray(values, dtype=np.float64)[None, :])
+
+    def add_block(self, ts, matrix):
+        """Queue a (samples, channels) block taken at the epoch seconds in ts."""
+        self._ts.append(np.asarray(ts, dtype=np.int64))
+        self._values.append(np.asarray(matrix, dtype=np.float64))
+        self._pending += matrix.size
+        if self._pending >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        """Write all queued samples in one transaction."""
+        if not self._pending:
+            return
+        ts = np.concatenate(self._ts)
+        matrix = np.concatenate(self._values)
+        self._ts, self._values, self._pending = [], [], 0
+
+        started = time.perf_counter()
+        with self.conn:
+            if self.legacy:
+                times = [sensor_store.from_epoch(t).strftime("%Y-%m-%d %H:%M:%S") for t in ts]
+                for c, name in enumerate(self.channels):
+                    self.conn.executemany(
+                        f'INSERT INTO "{name}" (Time, Value) VALUES (?, ?)',
+                        zip(times, matrix[:, c].tolist()),
+                    )
+            else:
+                # Row-major (time, channel) order keeps each batch time-ordered
+                channel = np.broadcast_to(self.channel_ids, matrix.shape).ravel().tolist()
+                stamps = np.repeat(ts, matrix.shape[1]).tolist()
+                self.conn.executemany(
+                    "INSERT INTO samples (channel, ts, value) VALUES (?, ?, ?)",
+                    zip(channel, stamps, matrix.ravel().tolist()),
+                )
+        if self.rollup and not self.legacy:
+            # update() runs its own transaction, so fold only after the batch commits
+            rollups.update(self.conn)
+        self.write_seconds += time.perf_counter() - started
+        self.rows_written += matrix.size
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+class Simulator:
+    """Synthetic samples for many channels at a fixed cadence, with noise bursts.
+
+    Each channel has its own baseline plus Gaussian noise; with probability
+    burst_rate per sample a burst of burst_length samples adds burst_amplitude.
+    """
+
+    def __init__(self, channels=64, rate_hz=1.0, baseline=50.0, noise=5.0,
+                 burst_rate=0.001, burst_amplitude=100.0, burst_length=10, seed=None):
+        if burst_length < 1:
+            raise ValueError(f"burst_length must be at least 1, got {burst_length}")
+        self.channels = channels
+        self.rate_hz = rate_hz
+        self.noise = noise
+        self.burst_rate = burst_rate
+        self.burst_amplitude = burst_amplitude
+        self.burst_length = burst_length
+        self.rng = np.random.default_rng(seed)
+        self.baseline = baseline * (0.5 + self.rng.random(channels))
+        self._burst_left = np.zeros(channels, dtype=np.int64)
+
+    def block(self, start, n):
+        """Return (ts, matrix) for n samples per channel starting at epoch start."""
+        ts = (start + np.arange(n) / self.rate_hz).astype(np.int64)
+        matrix = self.baseline + self.noise * self.rng.standard_normal((n, self.channels))
+
+        starts = self.rng.random((n, self.channels)) < self.burst_rate
+        # A sample is in a burst if one started within the last burst_length
+        # samples (a difference of running counts) or one is carried over
+        # from the previous block
+        started = np.cumsum(starts, axis=0)
+        lagged = np.zeros_like(started)
+        lagged[self.burst_length:] = started[:-self.burst_length]
+        rows = np.arange(n)[:, None]
+        in_burst = (started - lagged > 0) | (rows < self._burst_left[None, :])
+        matrix[in_burst] += self.burst_amplitude
+
+        last_start = np.where(starts, rows, -1).max(axis=0)
+        left = np.where(last_start >= 0, self.burst_length - (n - last_start), 0)
+        self._burst_left = np.maximum(np.maximum(left, self._burst_left - n), 0)
+        return ts, matrix
+
+
+def default_channels(source="realtime_data.db", count=64):
+    """Channel names from an existing legacy database, or the registry's
+    sensor tables (then Channel_N for any beyond them)."""
+    if os.path.exists(source):
+        conn = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+        try:
+            names = sensor_store.legacy_channel_tables(conn)
+        finally:
+            conn.close()
+        if names:
+            return names[:count]
+    names = REGISTRY.tables[:count].tolist()
+    return names + [f"Channel_{i}" for i in range(len(names) + 1, count + 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record simulated sensor data and report throughput.")
+    parser.add_argument("--db", default="simulated_data.db")
+    parser.add_argument("--channels-from", default="realtime_data.db",
+                        help="legacy database to take channel names from")
+    parser.add_argument("--rate", type=float, default=2.0, help="samples per second per channel")
+    parser.add_argument("--duration", type=float, default=3600, help="simulated seconds")
+    parser.add_argument("--block", type=float, default=1.0, help="simulated seconds per block")
+    parser.add_argument("--burst-rate", type=float, default=0.001)
+    parser.add_argument("--realtime", action="store_true", help="pace blocks to the wall clock")
+    parser.add_argument("--rollups", action="store_true", help="keep rollup tables up to date")
+    args = parser.parse_args()
+
+    recorder = Recorder(args.db, default_channels(args.channels_from), rollup=args.rollups)
+    simulator = Simulator(len(recorder.channels), args.rate, burst_rate=args.burst_rate)
+    start = int(time.time())
+    per_block = max(1, int(round(args.rate * args.block)))
+    blocks = int(args.duration / args.block)
+
+    began = time.perf_counter()
+    try:
+        for i in range(blocks):
+            ts, matrix = simulator.block(start + i * args.block, per_block)
+            recorder.add_block(ts, matrix)
+            if args.realtime:
+                recorder.flush()
+                delay = began + (i + 1) * args.block - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        recorder.flush()
+    except KeyboardInterrupt:
+        recorder.flush()
+    finally:
+        elapsed = time.perf_counter() - began
+        rows = recorder.rows_written
+        recorder.close()
+
+    print(f"Wrote {rows} rows in {elapsed:.2f} s: {rows / max(elapsed, 1e-9):,.0f} rows/s overall, "
+          f"{rows / max(recorder.write_seconds, 1e-9):,.0f} rows/s in SQLite.")
+    needed = len(recorder.channels) * args.rate
+    print(f"Required for {len(recorder.channels)} channels at {args.rate:g} Hz: {needed:,.0f} rows/s.")
+
+
+if __name__ == "__main__":
+    main()
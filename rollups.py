@@ -0,0 +1,147 @@
+import sys
+import time
+import sqlite3
+import argparse
+
+import sensor_store
+
+# Rollup resolutions in seconds: minute, hour, day
+RESOLUTIONS = (60, 3600, 86400)
+
+
+def _table(resolution):
+    return f"rollup_{resolution}"
+
+
+def create_rollups(conn):
+    """Create the rollup tables and their watermark table if missing."""
+    for res in RESOLUTIONS:
+        conn.execute(f"""CREATE TABLE IF NOT EXISTS {_table(res)} (
+            channel INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            vmin REAL,
+            vmax REAL,
+            vsum REAL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (channel, bucket)
+        ) WITHOUT ROWID""")
+    conn.execute("""CREATE TABLE IF NOT EXISTS rollup_state (
+        resolution INTEGER PRIMARY KEY,
+        last_rowid INTEGER NOT NULL
+    )""")
+    conn.executemany(
+        "INSERT OR IGNORE INTO rollup_state (resolution, last_rowid) VALUES (?, 0)",
+        [(res,) for res in RESOLUTIONS],
+    )
+
+
+def has_rollups(conn):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rollup_state'"
+    ).fetchone()
+    return row is not None
+
+
+def update(conn):
+    """Fold raw samples added since the last update into every rollup.
+
+    Only rows above each resolution's rowid watermark are read, and their
+    aggregates are merged into existing buckets with an upsert, so the cost
+    is proportional to the new data. Returns the number of raw rows folded.
+    """
+    create_rollups(conn)
+    (top,) = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM samples").fetchone()
+    folded = 0
+    with conn:
+        for res in RESOLUTIONS:
+            (last,) = conn.execute(
+                "SELECT last_rowid FROM rollup_state WHERE resolution = ?", (res,)
+            ).fetchone()
+            if last >= top:
+                continue
+            conn.execute(f"""
+                INSERT INTO {_table(res)} (channel, bucket, vmin, vmax, vsum, n)
+                SELECT channel, ts / ? * ?, MIN(value), MAX(value), SUM(value), COUNT(value)
+                FROM samples WHERE rowid > ? AND rowid <= ?
+                GROUP BY channel, ts / ?
+                ON CONFLICT (channel, bucket) DO UPDATE SET
+                    vmin = MIN(vmin, excluded.vmin),
+                    vmax = MAX(vmax, excluded.vmax),
+                    vsum = vsum + excluded.vsum,
+                    n = n + excluded.n""",
+                (res, res, last, top, res),
+            )
+            conn.execute(
+                "UPDATE rollup_state SET last_rowid = ? WHERE resolution = ?", (top, res)
+            )
+            folded = max(folded, top - last)
+    return folded
+
+
+def choose_resolution(start, end, points):
+    """Return the coarsest resolution giving at least `points` buckets in
+    [start, end), or None when raw samples are needed."""
+    span = sensor_store.to_epoch(end) - sensor_store.to_epoch(start)
+    chosen = None
+    for res in RESOLUTIONS:
+        if span / res >= points:
+            chosen = res
+    return chosen
+
+
+def read_rollup(conn, resolution, start, end, channels):
+    """Read (channel, bucket, vmin, vmax, mean, n) rows for every bucket
+    overlapping start <= time < end, including a partial first bucket."""
+    first = sensor_store.to_epoch(start) // resolution * resolution
+    marks = ", ".join("?" * len(channels))
+    return conn.execute(
+        f"""SELECT channel, bucket, vmin, vmax, vsum / n, n FROM {_table(resolution)}
+            WHERE channel IN ({marks}) AND bucket >= ? AND bucket < ?
+            ORDER BY channel, bucket""",
+        (*channels, first, sensor_store.to_epoch(end)),
+    ).fetchall()
+
+
+def prune_raw(conn, keep_seconds):
+    """Delete raw samples older than keep_seconds that every rollup has folded.
+
+    Returns the number of rows deleted. Run update() first so recent rows
+    are rolled up before their raw copies become eligible. The row with the
+    highest rowid is always kept: samples has no AUTOINCREMENT, so deleting
+    it would let SQLite hand out rowids below the watermark again.
+    """
+    create_rollups(conn)
+    (folded,) = conn.execute("SELECT MIN(last_rowid) FROM rollup_state").fetchone()
+    cutoff = int(time.time()) - keep_seconds
+    with conn:
+        cursor = conn.execute(
+            """DELETE FROM samples WHERE ts < ? AND rowid <= ?
+                   AND rowid < (SELECT MAX(rowid) FROM samples)""",
+            (cutoff, folded),
+        )
+    return cursor.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain rollup tables of a consolidated sensor store.")
+    parser.add_argument("db")
+    parser.add_argument("--keep-days", type=float, default=None,
+                        help="after updating, delete rolled-up raw samples older than this")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        if not sensor_store.is_consolidated(conn):
+            print("Rollups need a consolidated store; run sensor_store.py first.")
+            sys.exit(1)
+        folded = update(conn)
+        print(f"Rolled up {folded} new samples.")
+        if args.keep_days is not None:
+            deleted = prune_raw(conn, int(args.keep_days * 86400))
+            print(f"Pruned {deleted} raw samples.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import numpy as np
+
+# Colour bins for detector Z values: (low, high, colour name, RGB).
+# This table is the single source for marker colours and legend.txt.
+COLOR_BINS = [
+    (0, 0.2, "violet", (238, 130, 238)),
+    (0.2, 0.3, "Thistle", (216, 191, 216)),
+    (0.3, 0.4, "Fuchsia", (255, 0, 255)),
+    (0.4, 0.5, "DarkKhaki", (189, 183, 107)),
+    (0.5, 0.6, "Moccasin", (255, 228, 181)),
+    (0.6, 0.7, "grey", (128, 128, 128)),
+    (0.7, 0.8, "LawnGreen", (124, 252, 0)),
+    (0.8, 0.9, "purple", (128, 0, 128)),
+    (0.9, 1, "indigo", (75, 0, 130)),
+    (1, 2, "yellow", (255, 255, 0)),
+    (2, 3, "blue", (0, 0, 255)),
+    (3, 10, "green", (0, 128, 0)),
+    (10, 20, "orange", (255, 165, 0)),
+    (20, 30, "red", (255, 0, 0)),
+]
+# Values outside every bin are drawn like the lowest bin
+FALLBACK_BIN = 0
+
+MARKER_RADIUS = 3
+
+EDGES = np.array([low for low, _, _, _ in COLOR_BINS] + [COLOR_BINS[-1][1]], dtype=np.float64)
+# OpenCV images are BGR; the last row is the fallback colour
+BGR_LUT = np.array(
+    [rgb[::-1] for _, _, _, rgb in COLOR_BINS] + [COLOR_BINS[FALLBACK_BIN][3][::-1]],
+    dtype=np.uint8,
+)
+
+
+def z_to_bin(z):
+    """Map Z values to bin indexes (bins are low <= z < high); out-of-range
+    values get len(COLOR_BINS). A scalar z gives a scalar index."""
+    z = np.asarray(z, dtype=np.float64)
+    idx = np.digitize(z, EDGES) - 1
+    outside = (idx < 0) | (idx >= len(COLOR_BINS)) | np.isnan(z)
+    idx = np.where(outside, len(COLOR_BINS), idx)
+    return idx[()] if idx.ndim == 0 else idx
+
+
+def legend_lines():
+    """Return the legend text lines, highest bin first, as in legend.txt."""
+    return [f"{name}: {low:g} <= z < {high:g}" for low, high, name, _ in reversed(COLOR_BINS)]
+
+
+def write_legend(path):
+    with open(path, "w", newline="\r\n") as f:
+        f.write("\n".join(legend_lines()) + "\n")
+
+
+def disk_offsets(radius=MARKER_RADIUS):
+    """Return (dy, dx) pixel offsets of a filled disk, rasterised once."""
+    r = np.arange(-radius, radius + 1)
+    dy, dx = np.meshgrid(r, r, indexing="ij")
+    inside = dy * dy + dx * dx <= radius * radius  # Same shape as cv2.circle
+    return dy[inside], dx[inside]
+
+
+class MarkerStamp:
+    """Pre-rasterised marker used to paint many detectors with one assignment.
+
+    The pixels of the last marker layout drawn are kept, so redrawing the
+    same detectors with new colours only scatters the colours.
+    """
+
+    def __init__(self, radius=MARKER_RADIUS):
+        self.radius = radius
+        self.dy, self.dx = disk_offsets(radius)
+        self._layout = None
+
+    def pixels(self, x, y, shape):
+        """Return (flat pixel index, marker index) for markers at x, y in shape.
+
+        Markers clear of the border use precomputed flat offsets; only those
+        touching the border are clipped pixel by pixel.
+        """
+        h, w = shape[:2]
+        r = self.radius
+        x = np.asarray(x, dtype=np.intp)
+        y = np.asarray(y, dtype=np.intp)
+        interior = (x >= r) & (x < w - r) & (y >= r) & (y < h - r)
+
+        inner = np.flatnonzero(interior)
+        offsets = self.dy * w + self.dx
+        flat = ((y[inner] * w + x[inner])[:, None] + offsets).ravel()
+        owner = np.repeat(inner, len(offsets))
+
+        edge = np.flatnonzero(~interior)
+        if len(edge):
+            rows = y[edge, None] + self.dy
+            cols = x[edge, None] + self.dx
+            inside = (rows >= 0) & (rows < h) & (cols >= 0) & (cols < w)
+            # Later markers win where they overlap, as with one cv2.circle per row
+            edge_owner = np.broadcast_to(edge[:, None], rows.shape)[inside]
+            flat = np.concatenate(((rows * w + cols)[inside], flat))
+            owner = np.concatenate((edge_owner, owner))
+            order = np.argsort(owner, kind="stable")
+            flat, owner = flat[order], owner[order]
+        return flat, owner
+
+    def layout(self, x, y, shape):
+        """Like pixels(), but each covered pixel appears once, owned by its
+        topmost (last) marker; the last layout is cached."""
+        x = np.asarray(x, dtype=np.intp)
+        y = np.asarray(y, dtype=np.intp)
+        cached = self._layout
+        if cached is not None and cached[2] == shape[:2] \
+                and np.array_equal(cached[0], x) and np.array_equal(cached[1], y):
+            return cached[3], cached[4]
+        flat, owner = self.pixels(x, y, shape)
+        # Index of the last entry per pixel; repeated indices keep the last write
+        last = np.full(shape[0] * shape[1], -1, dtype=np.intp)
+        last[flat] = np.arange(len(flat))
+        flat = np.flatnonzero(last >= 0)
+        owner = owner[last[flat]]
+        self._layout = (x.copy(), y.copy(), shape[:2], flat, owner)
+        return flat, owner
+
+    def draw(self, img, x, y, bins, lut=BGR_LUT):
+        """Paint markers coloured by lut[bins] onto a contiguous BGR img in
+        place, writing each covered pixel once."""
+        flat, owner = self.layout(x, y, img.shape)
+        img.reshape(-1, img.shape[2])[flat] = lut[np.asarray(bins)[owner]]
+        return img
+
+
+# One stamp per radius, so repeated draws of a layout reuse its pixels
+_STAMPS = {}
+
+
+def draw_detectors(img, x, y, z, radius=MARKER_RADIUS):
+    """Colour every detector by its Z value and draw it onto img in place."""
+    stamp = _STAMPS.get(radius)
+    if stamp is None:
+        stamp = _STAMPS[radius] = MarkerStamp(radius)
+    return stamp.draw(img, x, y, z_to_bin(z))
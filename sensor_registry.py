@@ -0,0 +1,213 @@
+import re
+import copy
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# KKS tags of the 64 detector sensors; sensor A01 has index 0, A64 index 63
+SENSOR_TAGS = (
+    "10JEC13CY203", "10JEC13CY202", "10JEC13CY201", "10JEC23CY203", "10JEC23CY202", "10JEC23CY201",
+    "10JEC33CY203", "10JEC33CY202", "10JEC33CY201", "10JEC43CY203", "10JEC43CY202", "10JEC43CY201",
+    "10JEC11CY201", "10JEC11CY202", "10JEC21CY201", "10JEC21CY202", "10JEC31CY201", "10JEC31CY202",
+    "10JEC41CY201", "10JEC41CY202", "10JEC12CY203", "10JEC12CY204", "10JEC12CY205", "10JEC22CY203",
+    "10JEC22CY204", "10JEC22CY205", "10JEC32CY203", "10JEC32CY204", "10JEC32CY205", "10JEC42CY203",
+    "10JEC42CY204", "10JEC42CY205", "10JEF10CY201", "10JEF10CY202", "10JEF10CY203", "10JEF10CY204",
+    "10JNG50CY201", "10JNG50CY202", "10JNG60CY201", "10JNG60CY202", "10JNG70CY201", "10JNG70CY202",
+    "10JNG70CY203", "10JNG80CY201", "10JNG80CY202", "10JEF10CY205", "10JEF10CY206", "10JEF10CY207",
+    "10JEF10CY208", "10JEF10CY209", "10JEF10CY210", "10JEF10CY211", "10JEF10CY212", "10JEF10CY213",
+    "10JEF10CY214", "10JEF10CY215", "10JEF10CY216", "10JEF10CY217", "10JAB10CY205", "10JAB10CY206",
+    "10JAB10CY207", "10JAB10CY208", "10JAB10CY209", "10JAB10CY210",
+)
+# Subsystem codes, as found in characters 2-4 of a tag
+GROUPS = ("JEC", "JEF", "JNG", "JAB")
+OTHER_GROUP = "other"
+# Names this registry does not list still resolve by their Axx ID or Channel_N number
+SENSOR_ID = re.compile(r"^A(\d{2})(?:[ _]|$)")
+CHANNEL_NAME = re.compile(r"^Channel_(\d+)$")
+# Column sets whose sensor positions are kept, least recently used dropped first
+MAX_LOCATED = 32
+
+
+class SensorRegistry:
+    """Small integer index for every sensor and each name it goes by.
+
+    ids ('A01'), tags ('10JEC13CY203'), labels (text export columns,
+    'A01 10JEC13CY203'), tables (legacy database tables,
+    'A01_10JEC13CY203'), channels ('Channel_1' placeholders), group codes
+    and detector x/y are parallel arrays indexed by it. Every name maps to
+    its index through one dict, so resolving a frame's columns or a
+    database's channels is a dict lookup per name, done once per column set.
+    Coordinates are NaN here; with_detectors() returns a copy holding them.
+    """
+
+    def __init__(self, tags=SENSOR_TAGS):
+        count = len(tags)
+        self.tags = np.array(tags)
+        self.ids = np.array([f"A{i + 1:02d}" for i in range(count)])
+        self.labels = np.char.add(np.char.add(self.ids, " "), self.tags)
+        self.tables = np.char.add(np.char.add(self.ids, "_"), self.tags)
+        self.channels = np.array([f"Channel_{i + 1}" for i in range(count)])
+        self.group_names = GROUPS + (OTHER_GROUP,)
+        self.groups = np.array(
+            [GROUPS.index(t[2:5]) if t[2:5] in GROUPS else len(GROUPS) for t in tags], dtype=np.int8
+        )
+        self.x = np.full(count, np.nan)
+        self.y = np.full(count, np.nan)
+        self._index = {}
+        for names in (self.ids, self.tags, self.labels, self.tables, self.channels):
+            self._index.update((str(name), i) for i, name in enumerate(names))
+        self._located = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.tags)
+
+    def index(self, name):
+        """Index of a sensor by any of its names, or -1 if it is not a sensor."""
+        name = str(name)
+        i = self._index.get(name)
+        if i is None:
+            match = SENSOR_ID.match(name) or CHANNEL_NAME.match(name)
+            i = int(match.group(1)) - 1 if match else -1
+            if not 0 <= i < len(self):
+                return -1
+            self._index[name] = i  # Only sensors are remembered
+        return i
+
+    def indices(self, names):
+        """Indices of many names as an intp array (-1 for non-sensors)."""
+        return np.fromiter((self.index(n) for n in names), dtype=np.intp)
+
+    def group_indices(self, group):
+        """Indices of every sensor in a subsystem group, in A01..A64 order."""
+        return np.flatnonzero(self.groups == self.group_names.index(group))
+
+    def group_of(self, name):
+        """Subsystem group of a sensor name (OTHER_GROUP for non-sensors)."""
+        i = self.index(name)
+        return self.group_names[self.groups[i]] if i >= 0 else OTHER_GROUP
+
+    def join(self, sensors, names):
+        """Position of each sensor index within names (e.g. a database's
+        channels), -1 where names does not have it."""
+        found = self.indices(names)
+        known = np.flatnonzero(found >= 0)
+        slot = np.full(len(self), -1, dtype=np.intp)
+        slot[found[known[::-1]]] = known[::-1]   # First occurrence wins
+        return slot[np.asarray(sensors, dtype=np.intp)]
+
+    def locate(self, columns):
+        """Return (positions, sensors) of the sensor columns among columns.
+
+        Both are intp arrays in column order; the last MAX_LOCATED column
+        sets are memoized, as every frame of a dataset shares one.
+        """
+        key = tuple(columns)
+        with self._lock:
+            located = self._located.get(key)
+            if located is not None:
+                self._located.move_to_end(key)
+                return located
+        sensors = self.indices(key)
+        positions = np.flatnonzero(sensors >= 0)
+        located = (positions, sensors[positions])
+        with self._lock:
+            self._located[key] = located
+            while len(self._located) > MAX_LOCATED:
+                self._located.popitem(last=False)
+        return located
+
+    def block(self, frame, sensors=None):
+        """Return (positions, sensors, matrix) for the sensor columns of a
+        DataFrame or loader.ConcatView.
+
+        matrix is (rows, sensors) float32 in column order and Fortran-ordered,
+        so each sensor is contiguous. When the columns are adjacent and share
+        one float32 block, as loader and parse_cache build them, it is a view
+        rather than a copy. sensors, if given, keeps only those indices.
+        """
+        # Imported here so the GUIs can import this module without pandas
+        from loader import ConcatView
+        if isinstance(frame, ConcatView):
+            return self._concat_block(frame, sensors)
+        positions, found = self.locate(frame.columns)
+        if sensors is not None:
+            keep = np.flatnonzero(np.isin(found, sensors))
+            positions, found = positions[keep], found[keep]
+        if len(positions) and positions[-1] - positions[0] == len(positions) - 1:
+            matrix = frame.iloc[:, positions[0]:positions[-1] + 1].to_numpy(dtype=np.float32)
+        else:
+            matrix = frame.iloc[:, positions].to_numpy(dtype=np.float32)
+        return positions, found, np.asfortranarray(matrix)
+
+    def _concat_block(self, view, sensors):
+        """Stack every frame's block in the first frame's sensor order."""
+        parts = [self.block(frame, sensors) for frame in view.frames]
+        if not parts:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty, np.empty((0, 0), dtype=np.float32, order="F")
+        positions, found, _ = parts[0]
+        order = np.argsort(found)
+        matrix = np.empty((sum(len(p[2]) for p in parts), len(found)), dtype=np.float32, order="F")
+        row = 0
+        for _, part_found, part in parts:
+            if len(part_found) != len(found) or not np.array_equal(np.sort(part_found), found[order]):
+                raise ValueError("Frames have different sensor columns and cannot be joined")
+            # Column of part holding each of the first frame's sensors
+            columns = np.argsort(part_found)[np.argsort(order)]
+            if np.array_equal(columns, np.arange(len(found))):
+                matrix[row:row + len(part)] = part
+            else:
+                matrix[row:row + len(part)] = part[:, columns]
+            row += len(part)
+        return positions, found, matrix
+
+    def detector_sensors(self, detloc):
+        """Sensor index of each row of a detloc table.
+
+        A 'Sensor' column may name sensors in any form index() accepts;
+        without one, rows are taken to be in A01..A64 order (rows beyond the
+        last sensor get -1).
+        """
+        if 'Sensor' in detloc.columns:
+            sensors = self.indices(detloc['Sensor'])
+            if (sensors < 0).any():
+                unknown = detloc['Sensor'][sensors < 0].tolist()
+                raise ValueError(f"Unknown sensors in detector table: {unknown}")
+            return sensors
+        sensors = np.arange(len(detloc), dtype=np.intp)
+        sensors[sensors >= len(self)] = -1
+        return sensors
+
+    def with_detectors(self, detloc):
+        """Return a copy of the registry with x/y taken from a detloc table.
+
+        Sensors without a detector row keep NaN. The copy shares the name
+        lookups and caches, so this registry is left unchanged.
+        """
+        sensors = self.detector_sensors(detloc)
+        placed = sensors >= 0
+        registry = copy.copy(self)
+        registry.x = np.full(len(self), np.nan)
+        registry.y = np.full(len(self), np.nan)
+        registry.x[sensors[placed]] = detloc['X'].to_numpy()[placed]
+        registry.y[sensors[placed]] = detloc['Y'].to_numpy()[placed]
+        return registry
+
+
+REGISTRY = SensorRegistry()
+
+
+def sensor_frame(columns, matrix, others):
+    """Build a DataFrame with the given column order whose sensor columns
+    are one block over matrix (no copy); others maps each remaining column
+    name to its values."""
+    import pandas as pd
+    positions, _ = REGISTRY.locate(columns)
+    frame = pd.DataFrame(matrix, columns=[columns[p] for p in positions], copy=False)
+    is_sensor = np.zeros(len(columns), dtype=bool)
+    is_sensor[positions] = True
+    for position in np.flatnonzero(~is_sensor):
+        frame.insert(int(position), columns[position], others[columns[position]])
+    return frame
@@ -0,0 +1,171 @@
+import sys
+import sqlite3
+from datetime import datetime, timezone
+
+# Consolidated layout: one narrow sample table keyed by an integer channel id
+# and integer epoch seconds. The (channel, ts, value) index covers every read
+# the applications make, so range scans never touch the table itself.
+# Legacy tables contain repeated timestamps, so (channel, ts) is not unique.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS samples (
+    channel INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    value REAL
+);
+CREATE INDEX IF NOT EXISTS samples_channel_ts ON samples (channel, ts, value);
+"""
+# Condition keeping only rows of {0} that samples does not hold yet (same
+# channel, ts and value); a repeated timestamp with another value is new.
+# The covering index answers it without touching the table.
+NOT_STORED = """NOT EXISTS (
+    SELECT 1 FROM samples AS s
+    WHERE s.channel = {0}.channel AND s.ts = {0}.ts AND s.value IS {0}.value
+)"""
+
+
+def create_schema(conn):
+    """Create the consolidated tables and index if they are missing."""
+    conn.executescript(SCHEMA)
+
+
+def has_samples(conn):
+    """Return True if the consolidated store holds any sample."""
+    return conn.execute("SELECT 1 FROM samples LIMIT 1").fetchone() is not None
+
+
+def is_consolidated(conn):
+    """Return True if the connection points at a consolidated store."""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'samples'"
+    ).fetchone()
+    return row is not None
+
+
+def to_epoch(value):
+    """Convert a datetime or 'YYYY-MM-DD HH:MM:SS' string to epoch seconds.
+
+    Legacy timestamps carry no zone, so they are read as UTC, which is what
+    SQLite's strftime('%s', ...) does during migration.
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+def from_epoch(ts):
+    """Convert epoch seconds back to a naive datetime (UTC, like the source)."""
+    return datetime.fromtimestamp(int(ts), tz=timezone.utc).replace(tzinfo=None)
+
+
+def legacy_channel_tables(conn, schema="main"):
+    """List legacy per-channel tables (Time TEXT, Value REAL) that hold rows."""
+    tables = []
+    names = conn.execute(
+        f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table' ORDER BY name"
+    ).fetchall()
+    for (name,) in names:
+        columns = [row[1] for row in conn.execute(f'PRAGMA {schema}.table_info("{name}")')]
+        if columns != ["Time", "Value"]:
+            continue
+        if conn.execute(f'SELECT 1 FROM {schema}."{name}" LIMIT 1').fetchone() is None:
+            continue  # Skip the empty Channel_N placeholders
+        tables.append(name)
+    return tables
+
+
+def channel_ids(conn):
+    """Return a {name: id} mapping of the channels in a consolidated store."""
+    return {name: cid for cid, name in conn.execute("SELECT id, name FROM channels ORDER BY id")}
+
+
+def read_range(conn, start, end, channels=None):
+    """Read (channel, ts, value) rows with start <= ts < end in one indexed query.
+
+    `channels` is an optional list of channel ids; by default every channel is
+    read. Listing the ids lets SQLite walk the covering index once per channel
+    instead of scanning the whole table.
+    """
+    if channels is None:
+        channels = list(channel_ids(conn).values())
+    marks = ", ".join("?" * len(channels))
+    return conn.execute(
+        f"""SELECT channel, ts, value FROM samples
+            WHERE channel IN ({marks}) AND ts >= ? AND ts < ?
+            ORDER BY channel, ts""",
+        (*channels, to_epoch(start), to_epoch(end)),
+    ).fetchall()
+
+
+def migrate(src_path, dst_path):
+    """Copy a table-per-channel database into a consolidated store.
+
+    The conversion runs inside SQLite (ATTACH + INSERT ... SELECT), one
+    statement per channel, in a single transaction. Into an empty store the
+    index is dropped and built once at the end; into one that already has
+    samples (a second run, or a store the recorder writes to) rows it holds
+    already are skipped one by one. Returns (rows written, rows skipped).
+    """
+    dst = sqlite3.connect(dst_path)
+    try:
+        create_schema(dst)
+        dst.execute("ATTACH DATABASE ? AS src", (src_path,))
+        dedupe = has_samples(dst)
+        written = skipped = 0
+        with dst:
+            if not dedupe:
+                dst.execute("DROP INDEX IF EXISTS samples_channel_ts")
+            for name in legacy_channel_tables(dst, "src"):
+                dst.execute("INSERT OR IGNORE INTO channels (name) VALUES (?)", (name,))
+                (cid,) = dst.execute(
+                    "SELECT id FROM channels WHERE name = ?", (name,)
+                ).fetchone()
+                (rows,) = dst.execute(
+                    f'SELECT COUNT(*) FROM src."{name}" WHERE Time IS NOT NULL'
+                ).fetchone()
+                cursor = dst.execute(
+                    f"""INSERT INTO samples (channel, ts, value)
+                        SELECT channel, ts, value FROM (
+                            SELECT ? AS channel, CAST(strftime('%s', Time) AS INTEGER) AS ts,
+                                   Value AS value
+                            FROM src."{name}"
+                            WHERE Time IS NOT NULL
+                            ORDER BY Time
+                        ) AS new
+                        WHERE {NOT_STORED.format("new") if dedupe else "1"}""",
+                    (cid,),
+                )
+                written += cursor.rowcount
+                skipped += rows - cursor.rowcount
+            dst.execute(
+                "CREATE INDEX IF NOT EXISTS samples_channel_ts ON samples (channel, ts, value)"
+            )
+        dst.execute("DETACH DATABASE src")
+        dst.execute("ANALYZE")
+        return written, skipped
+    finally:
+        dst.close()
+
+
+def main():
+    if len(sys.argv) != 3:
+        print("Usage: python sensor_store.py <legacy.db> <consolidated.db>")
+        sys.exit(1)
+    src_path, dst_path = sys.argv[1], sys.argv[2]
+    try:
+        rows, skipped = migrate(src_path, dst_path)
+        print(f"Migrated {rows} samples from {src_path} to {dst_path}.")
+        if skipped:
+            print(f"Skipped {skipped} samples already in {dst_path}.")
+    except sqlite3.Error as e:
+        print(f"Error migrating database: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
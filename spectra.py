@@ -0,0 +1,184 @@
+import threading
+import weakref
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Segment lengths offered in the GUI, in samples
+WINDOW_SIZES = (256, 512, 1024, 2048, 4096)
+DEFAULT_WINDOW = 1024
+OVERLAPS = (0.0, 0.25, 0.5, 0.75)
+DEFAULT_OVERLAP = 0.5
+# Log-spaced frequency bands for the band-power trends
+BAND_COUNT = 6
+# Bound on the temporary (channels, segments, window) array, in elements
+_CHUNK_ELEMENTS = 8_000_000
+
+
+class Spectrum:
+    """Welch PSD of every sensor channel plus band power per segment.
+
+    psd is (channels, freqs) averaged over segments; band_power is
+    (channels, bands, segments) and times holds each segment's centre in
+    seconds from the first sample.
+    """
+
+    def __init__(self, labels, freqs, psd, band_edges, band_power, times, window, overlap, fs):
+        self.labels = labels
+        self.freqs = freqs
+        self.psd = psd
+        self.band_edges = band_edges
+        self.band_power = band_power
+        self.times = times
+        self.window = window
+        self.overlap = overlap
+        self.fs = fs
+
+
+def sample_rate(frame, probe=1000):
+    """Samples per second from the frame's Time column, or 1.0 if unknown."""
+    if 'Time' not in frame.columns:
+        return 1.0
+    import pandas as pd
+    times = pd.to_datetime(frame['Time'].iloc[:probe], errors='coerce').dropna()
+    if len(times) < 2:
+        return 1.0
+    step = np.median(np.diff(times.to_numpy()).astype('timedelta64[ns]').astype(np.int64)) / 1e9
+    return 1.0 / step if step > 0 else 1.0
+
+
+def band_edges(window, fs, count=BAND_COUNT):
+    """Log-spaced band edges from the first non-DC bin up to Nyquist."""
+    return np.geomspace(fs / window, fs / 2, count + 1)
+
+
+def welch(matrix, window=DEFAULT_WINDOW, overlap=DEFAULT_OVERLAP, fs=1.0, edges=None, check=None):
+    """Welch PSD of a (samples, channels) matrix, all channels at once.
+
+    Segments are strided views (no copies of the input), each mean-removed
+    and Hann-windowed, and transformed with one batched rfft per chunk of
+    segments. Returns (freqs, psd, band_power) with psd (channels, freqs) in
+    units^2/Hz and band_power (channels, bands, segments) in units^2 when
+    edges are given. NaNs are replaced by each channel's mean. check, if
+    given, is called between chunks (for cancellation).
+    """
+    x = np.asarray(matrix, dtype=np.float32).T
+    if np.isnan(x).any():
+        means = np.nan_to_num(np.nanmean(x, axis=1))
+        x = np.where(np.isnan(x), means[:, None], x)
+    channels, samples = x.shape
+    window = min(window, samples)
+    step = max(1, int(round(window * (1 - overlap))))
+    taper = np.hanning(window).astype(np.float32)
+    scale = 1.0 / (fs * float(np.sum(taper.astype(np.float64) ** 2)))
+    freqs = np.fft.rfftfreq(window, 1.0 / fs)
+
+    segments = sliding_window_view(x, window, axis=1)[:, ::step]
+    count = segments.shape[1]
+    if edges is not None:
+        # Frequency bin range of each band; the last band includes Nyquist
+        bins = np.searchsorted(freqs, edges)
+        bins[-1] = len(freqs)
+        band_power = np.zeros((channels, len(edges) - 1, count))
+    else:
+        band_power = None
+
+    total = np.zeros((channels, len(freqs)))
+    chunk = max(1, _CHUNK_ELEMENTS // max(1, channels * window))
+    for first in range(0, count, chunk):
+        if check is not None:
+            check()
+        seg = segments[:, first:first + chunk]
+        seg = (seg - seg.mean(axis=2, keepdims=True)) * taper
+        power = np.abs(np.fft.rfft(seg, axis=2)) ** 2 * scale
+        # One-sided spectrum: double everything except DC and (even) Nyquist
+        power[..., 1:len(freqs) - (window % 2 == 0)] *= 2
+        total += power.sum(axis=1)
+        if band_power is not None:
+            df = freqs[1] - freqs[0] if len(freqs) > 1 else fs
+            for b in range(len(edges) - 1):
+                lo, hi = bins[b], max(bins[b + 1], bins[b] + 1)
+                band_power[:, b, first:first + seg.shape[1]] = power[..., lo:hi].sum(axis=2) * df
+    return freqs, total / max(count, 1), band_power
+
+
+def compute_spectrum(frame, window=DEFAULT_WINDOW, overlap=DEFAULT_OVERLAP, check=None):
+    """Spectrum of every sensor column of a loaded dataset."""
+    from aggregates import sensor_matrix
+
+    labels, matrix = sensor_matrix(frame)
+    fs = sample_rate(frame)
+    window = min(window, len(matrix))
+    edges = band_edges(window, fs)
+    freqs, psd, band_power = welch(matrix, window, overlap, fs, edges, check)
+    step = max(1, int(round(window * (1 - overlap))))
+    times = (np.arange(band_power.shape[2]) * step + window / 2) / fs
+    return Spectrum(labels, freqs, psd, edges, band_power, times, window, overlap, fs)
+
+
+class SpectrumCache:
+    """Memoize spectra per loaded dataset and (window, overlap) setting.
+
+    Like aggregates.StatsCache, entries are tied to the frame object and
+    dropped when it is garbage collected.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, frame, window, overlap):
+        """Return the cached spectrum, or None."""
+        with self._lock:
+            entry = self._entries.get(id(frame))
+        if entry is not None and entry[0]() is frame:
+            return entry[1].get((window, overlap))
+        return None
+
+    def spectrum(self, frame, window, overlap, check=None):
+        """Return the spectrum for a frame and setting, computing it on first use."""
+        spectrum = self.get(frame, window, overlap)
+        if spectrum is not None:
+            return spectrum
+        spectrum = compute_spectrum(frame, window, overlap, check)
+        key = id(frame)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0]() is not frame:
+                ref = weakref.ref(frame, lambda _, key=key: self._forget(key))
+                entry = (ref, {})
+                self._entries[key] = entry
+            entry[1][(window, overlap)] = spectrum
+        return spectrum
+
+    def _forget(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+def plot_heatmap(axes, datasets):
+    """Channel x frequency PSD heatmaps (dB) for each (label, Spectrum) pair."""
+    images = []
+    for ax, (label, spectrum) in zip(axes, datasets):
+        db = 10 * np.log10(np.maximum(spectrum.psd[:, 1:], 1e-20))
+        extent = (spectrum.freqs[1], spectrum.freqs[-1], len(spectrum.labels) - 0.5, -0.5)
+        images.append(ax.imshow(db, aspect='auto', interpolation='nearest', extent=extent, cmap='viridis'))
+        ax.set_title(f"{label}: PSD")
+        ax.set_xlabel("Frequency, Hz")
+        ax.set_ylabel("Sensor Number")
+    return images
+
+
+def plot_band_trends(axes, datasets):
+    """Channel-averaged power per band over time for each (label, Spectrum) pair."""
+    for ax, (label, spectrum) in zip(axes, datasets):
+        mean_power = spectrum.band_power.mean(axis=0)
+        edges = spectrum.band_edges
+        for b in range(len(edges) - 1):
+            ax.plot(spectrum.times, mean_power[b], label=f"{edges[b]:.3g}-{edges[b + 1]:.3g} Hz")
+        ax.set_yscale('log')
+        ax.set_title(f"{label}: band power")
+        ax.set_xlabel("Time, s")
+        ax.set_ylabel("Power, mkV^2")
+        ax.legend(fontsize=8)
+        ax.grid(True)
@@ -0,0 +1,133 @@
+import os
+import sys
+import argparse
+from datetime import datetime
+
+import cv2
+import numpy as np
+import pandas as pd
+
+from query_engine import get_query
+from sensor_store import to_epoch
+from sensor_map import BGR_LUT, MARKER_RADIUS, MarkerStamp, z_to_bin
+from sensor_registry import REGISTRY
+
+
+def detector_positions(detloc, channels):
+    """Match detector rows to database channels; returns (x, y, channel rows).
+
+    The registry places each row on a sensor (from a 'Sensor' column such
+    as 'A01' or 'A01 10JEC13CY203', else in A01..A64 order) and the placed
+    sensors are joined to the channels by index; detectors without a
+    channel are left out.
+    """
+    registry = REGISTRY.with_detectors(detloc)
+    sensors = np.flatnonzero(~np.isnan(registry.x))
+    rows = registry.join(sensors, channels)
+    keep = rows >= 0
+    return registry.x[sensors[keep]], registry.y[sensors[keep]], rows[keep]
+
+
+class FrameRenderer:
+    """Paint detector markers over a cached background, one frame per call.
+
+    Marker pixels are resolved once: where markers overlap, each pixel keeps
+    only its topmost marker. Each frame then repaints just the pixels of
+    markers whose colour bin changed since the previous frame.
+    """
+
+    def __init__(self, background, x, y, radius=MARKER_RADIUS):
+        self.frame = np.ascontiguousarray(background).copy()
+        self.flat, self.owner = MarkerStamp(radius).layout(x, y, background.shape)
+        self.bins = np.full(len(x), -1, dtype=np.intp)
+
+    def render(self, bins):
+        """Update the frame for new marker bins and return it."""
+        changed = bins != self.bins
+        if changed.any():
+            sel = changed[self.owner]
+            pixels = self.frame.reshape(-1, self.frame.shape[2])
+            pixels[self.flat[sel]] = BGR_LUT[bins[self.owner[sel]]]
+            self.bins = bins.copy()
+        return self.frame
+
+
+class FrameWriter:
+    """Write frames to a video file, or to numbered PNGs if out is a directory."""
+
+    def __init__(self, out, size, fps):
+        self.out = out
+        self.index = 0
+        self.video = None
+        if os.path.isdir(out):
+            return
+        self.video = cv2.VideoWriter(out, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+        if not self.video.isOpened():
+            raise IOError(f"Cannot open video writer for {out}")
+
+    def write(self, frame):
+        if self.video is not None:
+            self.video.write(frame)
+        else:
+            cv2.imwrite(os.path.join(self.out, f"frame_{self.index:06d}.png"), frame)
+        self.index += 1
+
+    def close(self):
+        if self.video is not None:
+            self.video.release()
+
+
+def render_timelapse(db_path, image_path, detloc_path, start, end, step, out, fps=25):
+    """Render one map frame per `step` seconds between start and end.
+
+    Returns the number of frames written.
+    """
+    background = cv2.imread(image_path)
+    if background is None:
+        raise IOError(f"Cannot read {image_path}")
+    detloc = pd.read_csv(detloc_path, sep=';')
+
+    query = get_query(db_path)
+    result = query.fetch_range(start, end)
+    x, y, rows = detector_positions(detloc, query.channels)
+
+    grid = np.arange(to_epoch(start), to_epoch(end), step)
+    values = result.asof(grid)[rows]          # (detectors, frames)
+    bins = z_to_bin(values.ravel()).reshape(values.shape)
+
+    renderer = FrameRenderer(background, x, y)
+    writer = FrameWriter(out, (background.shape[1], background.shape[0]), fps)
+    try:
+        for i in range(len(grid)):
+            writer.write(renderer.render(bins[:, i]))
+    finally:
+        writer.close()
+    return len(grid)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a time-lapse sensor map from realtime_data.db.")
+    parser.add_argument("--db", default="realtime_data.db")
+    parser.add_argument("--image", default="1.png")
+    parser.add_argument("--detectors", default="detloc.csv")
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD[ HH:MM:SS]")
+    parser.add_argument("--end", required=True, help="YYYY-MM-DD[ HH:MM:SS], exclusive")
+    parser.add_argument("--step", type=int, default=60, help="seconds per frame")
+    parser.add_argument("--fps", type=int, default=25)
+    parser.add_argument("--out", default="timelapse.mp4", help="video file or existing directory for PNG frames")
+    args = parser.parse_args()
+
+    try:
+        frames = render_timelapse(
+            args.db, args.image, args.detectors,
+            datetime.fromisoformat(args.start), datetime.fromisoformat(args.end),
+            args.step, args.out, args.fps,
+        )
+        print(f"Wrote {frames} frames to {args.out}.")
+    except Exception as e:
+        print(f"Error rendering time-lapse: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+# Spans kept in memory; older ones are dropped
+MAX_SPANS = 5000
+# Recent spans per operation used for the rolling percentiles
+PERCENTILE_WINDOW = 200
+CATEGORIES = ("io", "compute", "render")
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None if unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+class Span:
+    """One timed operation: wall time, rows processed and RSS change."""
+
+    __slots__ = ("name", "category", "start", "seconds", "rows", "mem_delta", "thread")
+
+    def __init__(self, name, category, rows=None):
+        self.name = name
+        self.category = category
+        self.start = time.time()
+        self.seconds = 0.0
+        self.rows = rows
+        self.mem_delta = None
+        self.thread = threading.current_thread().name
+
+    def as_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class Tracer:
+    """Thread-safe recorder of spans from the GUI thread and worker jobs.
+
+    Memory deltas are process RSS before and after a span, so they include
+    whatever other threads allocated meanwhile; read them as a hint.
+    """
+
+    def __init__(self, max_spans=MAX_SPANS):
+        self.enabled = True
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, category="compute", rows=None):
+        """Time the with-block; set `.rows` on the yielded span if known later."""
+        record = Span(name, category, rows)
+        if not self.enabled:
+            yield record
+            return
+        rss = current_rss()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = time.perf_counter() - started
+            after = current_rss()
+            if rss is not None and after is not None:
+                record.mem_delta = after - rss
+            with self._lock:
+                self._spans.append(record)
+
+    def recent(self, count=50):
+        """The most recent spans, newest first."""
+        with self._lock:
+            spans = list(self._spans)
+        return spans[::-1][:count]
+
+    def summary(self, window=PERCENTILE_WINDOW):
+        """Return {name: (category, count, p50 s, p95 s, last rows)} over the
+        last `window` spans of each operation."""
+        with self._lock:
+            spans = list(self._spans)
+        by_name = {}
+        for record in spans:
+            by_name.setdefault(record.name, []).append(record)
+        result = {}
+        for name, records in by_name.items():
+            seconds = np.array([r.seconds for r in records[-window:]])
+            p50, p95 = np.percentile(seconds, [50, 95])
+            result[name] = (records[-1].category, len(records), p50, p95, records[-1].rows)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def dump(self, path):
+        """Write all spans in Chrome trace-event format (chrome://tracing, Perfetto).
+
+        Returns the number of spans written.
+        """
+        with self._lock:
+            spans = list(self._spans)
+        threads = {}
+        events = []
+        for record in spans:
+            tid = threads.setdefault(record.thread, len(threads))
+            events.append({
+                "name": record.name,
+                "cat": record.category,
+                "ph": "X",
+                "ts": record.start * 1e6,
+                "dur": record.seconds * 1e6,
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {"rows": record.rows, "mem_delta": record.mem_delta},
+            })
+        for name, tid in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": os.getpid(),
+                           "tid": tid, "args": {"name": name}})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return len(spans)
+
+
+# Process-wide tracer shared by the GUI and its worker jobs
+TRACER = Tracer()
+span = TRACER.span
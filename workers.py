@@ -0,0 +1,131 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class Cancelled(Exception):
+    """Raised inside a job once it has been cancelled or superseded."""
+
+
+class Job:
+    """Handle passed to every job function for progress and cancellation."""
+
+    def __init__(self, runner, key, generation):
+        self._runner = runner
+        self.key = key
+        self.generation = generation
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def check(self):
+        """Stop the job here if it has been cancelled."""
+        if self._cancelled.is_set():
+            raise Cancelled()
+
+    def report(self, percent, message=""):
+        """Report progress (0-100) to the GUI thread, then check for cancel."""
+        self.check()
+        self._runner._progressed.emit(self.key, self.generation, int(percent), message)
+
+
+class JobRunner(QObject):
+    """Run parse/aggregate/render-prep jobs on a thread pool.
+
+    Jobs are submitted under a key ("load", "plot", ...). Submitting a new
+    job for a key cancels the previous one: if it is still queued it never
+    starts, and if it is running its result is dropped. Callbacks are
+    delivered on the GUI thread through queued signals, so only the final
+    canvas draw touches Qt widgets.
+    """
+
+    _finished = pyqtSignal(str, int, object)
+    _failed = pyqtSignal(str, int, str)
+    _progressed = pyqtSignal(str, int, int, str)
+
+    # Public signals for a status bar: (key, percent, message) and (key)
+    progress = pyqtSignal(str, int, str)
+    idle = pyqtSignal(str)
+
+    def __init__(self, parent=None, max_workers=None):
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._jobs = {}  # key -> (job, future, on_done, on_error)
+        self._finished.connect(self._deliver_result)
+        self._failed.connect(self._deliver_error)
+        self._progressed.connect(self._deliver_progress)
+
+    def submit(self, key, fn, *args, on_done=None, on_error=None):
+        """Run fn(job, *args) in the pool, superseding any job under `key`."""
+        self.cancel(key)
+        previous = self._jobs.get(key)
+        generation = previous[0].generation + 1 if previous else 0
+        job = Job(self, key, generation)
+        future = self._executor.submit(self._run, job, fn, args)
+        self._jobs[key] = (job, future, on_done, on_error)
+        return job
+
+    def cancel(self, key=None):
+        """Cancel the job under `key`, or every job when key is None."""
+        keys = list(self._jobs) if key is None else [key]
+        for k in keys:
+            entry = self._jobs.get(k)
+            if entry is None:
+                continue
+            job, future, _, _ = entry
+            job.cancel()
+            if future.cancel():
+                self.idle.emit(k)
+
+    def running(self):
+        """Keys whose job is queued or running and has not been cancelled."""
+        return [k for k, (job, future, _, _) in self._jobs.items()
+                if not job.cancelled() and not future.done()]
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job, fn, args):
+        try:
+            job.check()
+            result = fn(job, *args)
+            job.check()
+        except Cancelled:
+            self._failed.emit(job.key, job.generation, "")
+            return
+        except Exception as e:
+            self._failed.emit(job.key, job.generation, str(e))
+            return
+        self._finished.emit(job.key, job.generation, result)
+
+    def _current(self, key, generation):
+        entry = self._jobs.get(key)
+        if entry is None or entry[0].generation != generation or entry[0].cancelled():
+            return None
+        return entry
+
+    def _deliver_result(self, key, generation, result):
+        entry = self._jobs.get(key)
+        if entry is None or entry[0].generation != generation:
+            return  # Superseded
+        self.idle.emit(key)
+        if not entry[0].cancelled() and entry[2] is not None:
+            entry[2](result)
+
+    def _deliver_error(self, key, generation, message):
+        entry = self._jobs.get(key)
+        if entry is None or entry[0].generation != generation:
+            return  # Superseded
+        self.idle.emit(key)
+        if not entry[0].cancelled() and entry[3] is not None:
+            entry[3](message)
+
+    def _deliver_progress(self, key, generation, percent, message):
+        if self._current(key, generation) is not None:
+            self.progress.emit(key, percent, message)